@@ -1,24 +1,12 @@
-from gi.repository import GdkPixbuf, Gtk, Gdk
-from loguru import logger
+import shared  # noqa: F401
+from gi.repository import Gdk
+from util.icon_cache import IconPixbufCache
 
+ICON_CACHE_CAPACITY = 512
 
-def get_app_icon_pixbuf(
-    name: str, width: int, height: int, preserve_aspect_ratio: bool = True
-) -> GdkPixbuf.Pixbuf:
-    icon_theme = Gtk.IconTheme.get_default()
-    icon_info = icon_theme.lookup_icon(name, width, 0)  # No Flags
-    if icon_info is not None:
-        icon_path = icon_info.get_filename()
-        try:
-            icon_pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                icon_path, width, height, preserve_aspect_ratio
-            )
-            return icon_pixbuf
-        except Exception as e:
-            logger.error(f"{e}")
-            return None
 
-    return None
+def get_icon_cache() -> IconPixbufCache:
+    return IconPixbufCache.get_instance(capacity=ICON_CACHE_CAPACITY)
 
 
 def add_hover_cursor(widget):
@@ -0,0 +1,29 @@
+"""
+Lets a short lived process talk to a resident runner over a unix socket.
+Only depends on the standard library so signalling the runner does not pay
+for GTK or fabric imports.
+"""
+import os
+import socket
+import sys
+
+SOCKET_PATH = os.path.join(os.getenv("XDG_RUNTIME_DIR", "/tmp"), "gem-runner.sock")
+
+SHOW_COMMAND = "show"
+
+
+def send_command(command: str) -> bool:
+    """Returns True if a running runner received the command."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(SOCKET_PATH)
+            client.sendall(command.encode())
+    except OSError:
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else SHOW_COMMAND
+    sys.exit(0 if send_command(command) else 1)
@@ -1,25 +1,57 @@
 from fabric import Application
 from fabric.utils import monitor_file, get_relative_path
+from gi.repository import Gdk, GLib, Gtk
+from loguru import logger
+import os
 import setproctitle
 
+import shared  # noqa: F401
 from modules.runner import Runner
+from ipc import send_command, SHOW_COMMAND
+from config.storage import STORAGE_DIRECTORY
+from util.style_manager import StyleManager
+
+# colors the shell extracted from the wallpaper, they override colors.css
+THEME_COLORS_PATH = STORAGE_DIRECTORY + "theme_colors.css"
+
+
+def load_theme_colors(provider: Gtk.CssProvider, *_) -> None:
+    if not os.path.exists(THEME_COLORS_PATH):
+        return
+
+    try:
+        provider.load_from_path(THEME_COLORS_PATH)
+    except GLib.Error as e:
+        logger.warning(f"Could not load theme colors: {e}")
 
 
 def main():
     APP_NAME = "Gem-Runner"
 
+    # a runner is already resident, it only needs to be shown
+    if send_command(SHOW_COMMAND):
+        return
+
     setproctitle.setproctitle(APP_NAME)
 
     runner = Runner()
     app = Application(APP_NAME, runner)
 
-    def apply_stylesheet(*_):
-        return app.set_stylesheet_from_file(get_relative_path("main.css"))
-
-    style_monitor = monitor_file(get_relative_path("./styles"))
-    style_monitor.connect("changed", apply_stylesheet)
-
-    app.set_stylesheet_from_file(get_relative_path("main.css"))
+    style_manager = StyleManager(get_relative_path("main.css"))
+    style_manager.load()
+
+    theme_colors_provider = Gtk.CssProvider()
+    Gtk.StyleContext.add_provider_for_screen(
+        Gdk.Screen.get_default(),
+        theme_colors_provider,
+        Gtk.STYLE_PROVIDER_PRIORITY_USER + 1,
+    )
+    load_theme_colors(theme_colors_provider)
+
+    theme_colors_monitor = monitor_file(THEME_COLORS_PATH)
+    theme_colors_monitor.connect(
+        "changed", lambda *_: load_theme_colors(theme_colors_provider)
+    )
 
     app.run()
 
@@ -0,0 +1,194 @@
+from collections.abc import Callable
+
+from fabric.widgets.scrolledwindow import ScrolledWindow
+from gi.repository import Gtk
+
+from modules.app_element import AppElement
+from modules.desktop_app import DesktopApp
+from modules.history import LaunchHistory
+from modules.search import SearchEngine
+
+LIST_PADDING = 20
+ROW_SPACING = 20
+# rows realized above and below the visible ones, so short scrolls only move
+# rows that already exist
+OVERSCAN_ROWS = 3
+
+# launch history adds at most this many tiers to an app's search rank
+MAX_SEARCH_BOOST = 1.5
+# frecency score at which an app gets half of the maximum boost
+HALF_BOOST_SCORE = 3.0
+
+
+class AppList:
+    def __init__(self, apps: list[DesktopApp]):
+        self.history = LaunchHistory()
+
+        self.app_table = {}
+        self.search_engine = SearchEngine()
+
+        for app in apps:
+            self.add(app)
+
+        self.update_boosts()
+
+    def add(self, app: DesktopApp) -> None:
+        # apps are keyed by their desktop file, names are only shown and
+        # recorded in the launch history, several apps may share one
+        self.app_table[app.path] = app
+        self.search_engine.add(app.path, app.name, app.search_fields)
+
+    def remove(self, app: DesktopApp) -> None:
+        if self.app_table.pop(app.path, None) is not None:
+            self.search_engine.remove(app.path)
+
+    def get_all_apps(self) -> list[DesktopApp]:
+        """Apps by frecency, apps that were never launched keep their order."""
+        scores = self.history.scores()
+
+        return sorted(
+            self.app_table.values(), key=lambda app: -scores.get(app.name, 0.0)
+        )
+
+    def search(self, query: str) -> list[DesktopApp]:
+        return [self.app_table[path] for path in self.search_engine.search(query)]
+
+    def record_launch(self, app: DesktopApp) -> None:
+        self.history.record(app.name)
+        self.update_boosts()
+
+    def update_boosts(self) -> None:
+        """Blends launch history into search ranking, scores decay over time."""
+        scores = self.history.scores()
+
+        self.search_engine.set_boosts(
+            {
+                path: MAX_SEARCH_BOOST * score / (score + HALF_BOOST_SCORE)
+                for path, app in self.app_table.items()
+                if (score := scores.get(app.name, 0.0)) > 0
+            }
+        )
+
+
+class AppListView(ScrolledWindow):
+    """
+    Scrollable list of apps that only realizes the rows in view plus a few
+    rows of overscan. Rows are positioned on a Gtk.Layout sized for the
+    whole list and recycled as it scrolls, so replacing the apps shown only
+    rebinds the existing rows.
+    """
+
+    def __init__(self, launch_callback: Callable[[DesktopApp], None], **kwargs):
+        super().__init__(**kwargs)
+        self.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+
+        self.launch_callback = launch_callback
+
+        self.apps: list[DesktopApp] = []
+        self.selected_index = 0
+
+        self._rows: list[AppElement] = []
+        self._row_height = None
+        self._width = 0
+
+        self.layout = Gtk.Layout(name="app-list")
+        self.layout.connect("size-allocate", self.on_layout_size_allocate)
+        # a reloaded stylesheet may change the height of rows
+        self.layout.connect("style-updated", self.on_layout_style_updated)
+        self.add(self.layout)
+
+        self.get_vadjustment().connect("value-changed", lambda *_: self.update_rows())
+
+    def set_apps(self, apps: list[DesktopApp]) -> None:
+        self.apps = apps
+        self.selected_index = 0
+
+        self.update_size()
+        self.get_vadjustment().set_value(0)
+        self.update_rows()
+
+    def get_selected_app(self) -> DesktopApp | None:
+        if self.selected_index < len(self.apps):
+            return self.apps[self.selected_index]
+
+    def select(self, index: int) -> None:
+        if index < 0 or index >= len(self.apps):
+            return
+
+        self.selected_index = index
+        for row in self._rows:
+            if row.get_visible():
+                row.set_selected(row.app is self.apps[index])
+
+        stride = self.get_row_stride()
+        top = LIST_PADDING + index * stride
+        self.get_vadjustment().clamp_page(
+            top - LIST_PADDING, top + self._row_height + LIST_PADDING
+        )
+
+    def refresh_app(self, app: DesktopApp) -> None:
+        """Updates the icon of an app if a row holds it."""
+        for row in self._rows:
+            if row.app is app:
+                row.update_icon()
+
+    def get_row_stride(self) -> int:
+        if self._row_height is None:
+            row = self._rows[0] if self._rows else self._create_row()
+            self._row_height = max(1, row.get_preferred_height()[1])
+
+        return self._row_height + ROW_SPACING
+
+    def update_size(self) -> None:
+        height = 2 * LIST_PADDING + len(self.apps) * self.get_row_stride()
+        self.layout.set_size(self._width, height - ROW_SPACING)
+
+    def update_rows(self) -> None:
+        vadjustment = self.get_vadjustment()
+        stride = self.get_row_stride()
+
+        first = max(
+            0, int((vadjustment.get_value() - LIST_PADDING) // stride) - OVERSCAN_ROWS
+        )
+        visible = int(vadjustment.get_page_size() // stride) + 1 + 2 * OVERSCAN_ROWS
+        last = min(len(self.apps), first + visible)
+
+        while len(self._rows) < last - first:
+            self._create_row()
+
+        for offset, row in enumerate(self._rows):
+            index = first + offset
+            if index >= last:
+                row.hide()
+                continue
+
+            row.bind(self.apps[index])
+            row.set_selected(index == self.selected_index)
+            self.layout.move(row, LIST_PADDING, LIST_PADDING + index * stride)
+            row.show()
+
+    def on_layout_size_allocate(self, layout, allocation):
+        if allocation.width == self._width:
+            return
+
+        self._width = allocation.width
+        for row in self._rows:
+            row.set_size_request(self._width - 2 * LIST_PADDING, -1)
+
+        self.update_size()
+        self.update_rows()
+
+    def on_layout_style_updated(self, *args):
+        self._row_height = None
+        self.update_size()
+        self.update_rows()
+
+    def _create_row(self) -> AppElement:
+        row = AppElement(self.launch_callback)
+        row.set_size_request(max(0, self._width - 2 * LIST_PADDING), -1)
+        row.show_all()
+        row.hide()
+        self.layout.put(row, LIST_PADDING, LIST_PADDING)
+        self._rows.append(row)
+
+        return row
@@ -1,42 +1,247 @@
+from gi.repository import Gdk, Gio, GLib
+from loguru import logger
 from pathlib import Path
-from helpers import get_app_icon_pixbuf
+import os
+import re
+import shlex
+import shutil
 
 
 ICON_WIDTH = 50
 ICON_HEIGHT = 50
 
+DESKTOP_ENTRY_GROUP = "[Desktop Entry]"
+LOCALIZED_KEYS = ("Name", "GenericName", "Keywords")
+# %f, %u and friends are replaced with arguments when an app is launched
+FIELD_CODE_PATTERN = re.compile(r"%[fFuUdDnNickvm]")
+ESCAPE_SEQUENCES = {"s": " ", "n": "\n", "t": "\t", "r": "\r", "\\": "\\", ";": ";"}
+
+
+def get_locale_suffixes() -> list[str]:
+    """
+    Locale suffixes of localized keys like Name[de_DE], best match first,
+    following the desktop entry spec.
+    """
+    locale = (
+        os.environ.get("LC_ALL")
+        or os.environ.get("LC_MESSAGES")
+        or os.environ.get("LANG")
+        or ""
+    )
+    match = re.fullmatch(r"([^_.@]+)(?:_([^.@]+))?(?:\.[^@]*)?(?:@(.+))?", locale)
+    if match is None or match.group(1) in ("C", "POSIX"):
+        return []
+
+    lang, country, modifier = match.groups()
+    suffixes = []
+    if country is not None and modifier is not None:
+        suffixes.append(f"{lang}_{country}@{modifier}")
+    if country is not None:
+        suffixes.append(f"{lang}_{country}")
+    if modifier is not None:
+        suffixes.append(f"{lang}@{modifier}")
+    suffixes.append(lang)
+
+    return suffixes
+
+
+LOCALE_SUFFIXES = get_locale_suffixes()
+
+
+def unescape(value: str) -> str:
+    return re.sub(
+        r"\\(.)", lambda match: ESCAPE_SEQUENCES.get(match[1], match[0]), value
+    )
+
+
+def split_list(value: str) -> list[str]:
+    """Splits a string list on semicolons that are not escaped."""
+    return [unescape(item) for item in re.split(r"(?<!\\);", value) if item]
+
+
+def get_executable(exec_value: str) -> str | None:
+    """Name of the program an Exec key runs, without field codes or env."""
+    try:
+        args = shlex.split(exec_value)
+    except ValueError:
+        return None
+
+    args = [arg for arg in args if FIELD_CODE_PATTERN.fullmatch(arg) is None]
+    if len(args) != 0 and args[0] == "env":
+        args = args[1:]
+        while len(args) != 0 and "=" in args[0]:
+            args = args[1:]
+
+    return os.path.basename(args[0]) if len(args) != 0 else None
+
 
 class DesktopApp:
-    def __init__(self, name: str, path: Path, icon: str):
+    __slots__ = (
+        "executable",
+        "generic_name",
+        "icon",
+        "icon_pixbuf",
+        "keywords",
+        "name",
+        "path",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        path: Path,
+        icon: str,
+        generic_name: str | None = None,
+        keywords: list[str] | None = None,
+        executable: str | None = None,
+    ):
         self.name = name
         self.path = path
-        self.icon_pixbuf = (
-            get_app_icon_pixbuf(icon, ICON_WIDTH, ICON_HEIGHT)
-            if icon is not None
-            else None
-        )
+        self.icon = icon
+        self.generic_name = generic_name
+        self.keywords = keywords if keywords is not None else []
+        self.executable = executable
+        # decoded off the main thread by DesktopAppLoader
+        self.icon_pixbuf = None
+
+    @property
+    def search_fields(self) -> list[str]:
+        """Fields besides the name that searches should match against."""
+        return [self.generic_name, *self.keywords, self.executable]
+
+    def launch(self) -> None:
+        app_info = Gio.DesktopAppInfo.new_from_filename(str(self.path))
+        if app_info is None:
+            logger.error(f"Could not load desktop file {self.path} to launch it.")
+            return
+
+        try:
+            app_info.launch([], Gdk.Display.get_default().get_app_launch_context())
+        except GLib.Error as e:
+            logger.error(f"Could not launch {self.name}: {e}")
 
     @classmethod
     def from_path(cls, path: Path):
         if path.exists():
-            name = None
-            icon = None
-
-            with path.open() as file:
-                for line in file.readlines():
-                    line = line.rstrip()
-                    components = line.split("=", maxsplit=1)
-                    if len(components) != 2:
-                        continue
+            return cls.from_fields(path, cls.parse(path))
+
+    @classmethod
+    def from_fields(cls, path: Path, fields: dict):
+        """Returns None for entries that should not be shown."""
+        if not cls.should_show(fields):
+            return None
+
+        return cls(
+            path=path,
+            name=fields["name"],
+            icon=fields["icon"],
+            generic_name=fields["generic_name"],
+            keywords=fields["keywords"],
+            executable=fields["executable"],
+        )
+
+    @staticmethod
+    def should_show(fields: dict) -> bool:
+        """
+        Applies the filters that depend on the session, so the index stays
+        valid when the desktop or installed programs change.
+        """
+        if fields["name"] is None or fields["hidden"]:
+            return False
+
+        desktops = set(os.environ.get("XDG_CURRENT_DESKTOP", "").split(":"))
+        if fields["only_show_in"] and desktops.isdisjoint(fields["only_show_in"]):
+            return False
+        if not desktops.isdisjoint(fields["not_show_in"]):
+            return False
+
+        try_exec = fields["try_exec"]
+        if try_exec is not None:
+            if os.path.isabs(try_exec):
+                return os.access(try_exec, os.X_OK)
+            return shutil.which(try_exec) is not None
 
-                    prop, value = components
+        return True
 
-                    if prop == "Name":
-                        name = value
-                    elif prop == "Icon":
-                        icon = value
+    @staticmethod
+    def parse(path: Path) -> dict:
+        """
+        Reads the fields the runner needs from the [Desktop Entry] group of a
+        desktop file in a single pass, without creating an app, so they can
+        be stored in the desktop index. Localized keys take the value that
+        best matches the current locale.
+        """
+        fields = {
+            "name": None,
+            "icon": None,
+            "generic_name": None,
+            "keywords": [],
+            "executable": None,
+            "try_exec": None,
+            # NoDisplay, Hidden and entries that are not applications
+            "hidden": False,
+            "only_show_in": [],
+            "not_show_in": [],
+        }
+        # locale rank of the value kept for each localized key, lower is better
+        ranks = {}
+        in_entry_group = False
 
-                    if name is not None and icon is not None:
+        with path.open(encoding="utf-8", errors="replace") as file:
+            for line in file:
+                line = line.strip()
+                if line == "" or line.startswith("#"):
+                    continue
+
+                if line.startswith("["):
+                    # actions live in later groups and have names of their own
+                    if in_entry_group:
                         break
+                    in_entry_group = line == DESKTOP_ENTRY_GROUP
+                    continue
+
+                if not in_entry_group:
+                    continue
+
+                key, separator, value = line.partition("=")
+                if separator == "":
+                    continue
+
+                key = key.strip()
+                value = value.strip()
+
+                if key.endswith("]"):
+                    key, _, locale = key[:-1].partition("[")
+                    if key not in LOCALIZED_KEYS or locale not in LOCALE_SUFFIXES:
+                        continue
+                    rank = LOCALE_SUFFIXES.index(locale)
+                else:
+                    rank = len(LOCALE_SUFFIXES)
+
+                if key in LOCALIZED_KEYS:
+                    if rank >= ranks.get(key, len(LOCALE_SUFFIXES) + 1):
+                        continue
+                    ranks[key] = rank
+
+                if key == "Name":
+                    fields["name"] = unescape(value)
+                elif key == "GenericName":
+                    fields["generic_name"] = unescape(value)
+                elif key == "Keywords":
+                    fields["keywords"] = split_list(value)
+                elif key == "Icon":
+                    fields["icon"] = unescape(value)
+                elif key == "Exec":
+                    fields["executable"] = get_executable(unescape(value))
+                elif key == "TryExec":
+                    fields["try_exec"] = unescape(value)
+                elif key == "Type":
+                    fields["hidden"] |= value != "Application"
+                elif key in ("NoDisplay", "Hidden"):
+                    fields["hidden"] |= value == "true"
+                elif key == "OnlyShowIn":
+                    fields["only_show_in"] = split_list(value)
+                elif key == "NotShowIn":
+                    fields["not_show_in"] = split_list(value)
 
-            return cls(name, path, icon)
+        return fields
@@ -0,0 +1,170 @@
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import shared  # noqa: F401
+from util.directory_watcher import DirectoryWatcher
+
+from modules.desktop_app import DesktopApp
+from modules.desktop_loader import DesktopAppLoader
+
+DESKTOP_FILE_SUFFIX = ".desktop"
+
+
+def get_application_dirs() -> list[Path]:
+    """XDG application directories, the ones that take precedence first."""
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+
+    application_dirs = []
+    for data_dir in [data_home, *data_dirs.split(":")]:
+        if data_dir == "":
+            continue
+
+        application_dir = Path(data_dir) / "applications"
+        if application_dir not in application_dirs:
+            application_dirs.append(application_dir)
+
+    return application_dirs
+
+
+class DesktopCatalog:
+    """
+    The apps installed in every XDG application directory. A desktop file
+    shadows files with the same desktop id in directories that come later.
+
+    Every directory is watched, so files that are added, changed or removed
+    are applied one at a time through on_app_added and on_app_removed, and
+    the runner never has to rescan. A changed app is removed and added again.
+    """
+
+    def __init__(
+        self,
+        loader: DesktopAppLoader,
+        on_app_added: Callable[[DesktopApp], None],
+        on_app_removed: Callable[[DesktopApp], None],
+    ):
+        self.loader = loader
+        self.on_app_added = on_app_added
+        self.on_app_removed = on_app_removed
+
+        self.application_dirs = get_application_dirs()
+        # visible app of every desktop id
+        self.apps: dict[str, DesktopApp] = {}
+
+        # desktop id -> {directory priority: path}, lowest priority is visible
+        self._sources: dict[str, dict[int, Path]] = {}
+        self._desktop_ids: dict[Path, str] = {}
+
+        self._watcher = DirectoryWatcher(self._sync)
+
+    def scan(self) -> list[DesktopApp]:
+        """
+        Returns the apps whose index entries are still valid, new or changed
+        apps are passed to on_app_added once they are parsed.
+        """
+        for priority, application_dir in enumerate(self.application_dirs):
+            for path in self._scan_directory(priority, application_dir):
+                self._add_source(priority, path)
+
+        visible_paths = [
+            self._get_visible_path(desktop_id) for desktop_id in self._sources
+        ]
+        apps = self.loader.load(visible_paths, self._on_loaded)
+        for app in apps:
+            self.apps[self._desktop_ids[app.path]] = app
+
+        return apps
+
+    def _scan_directory(self, priority: int, directory: Path) -> list[Path]:
+        """Watches a directory and its subdirectories, returns their desktop files."""
+        # directories that do not exist yet are watched too, so apps show up
+        # once the first one is installed there
+        self._watcher.watch(directory, priority)
+
+        try:
+            children = list(directory.iterdir())
+        except OSError:
+            return []
+
+        paths = []
+        for child in children:
+            if child.is_dir() and not child.is_symlink():
+                paths += self._scan_directory(priority, child)
+            elif child.suffix == DESKTOP_FILE_SUFFIX and child.is_file():
+                paths.append(child)
+
+        return paths
+
+    def _sync(self, path: Path, priority: int) -> None:
+        """Applies whatever state a path ended up in after a burst of events."""
+        if path.is_dir() and not path.is_symlink():
+            for desktop_path in self._scan_directory(priority, path):
+                self._update_source(priority, desktop_path)
+        elif path.suffix == DESKTOP_FILE_SUFFIX and path.is_file():
+            self._update_source(priority, path)
+        else:
+            # a removed directory takes every desktop file inside with it
+            removed = [
+                known
+                for known in self._desktop_ids
+                if known == path or path in known.parents
+            ]
+            for known in removed:
+                self._remove_source(priority, known)
+
+    def _add_source(self, priority: int, path: Path) -> str:
+        desktop_id = "-".join(path.relative_to(self.application_dirs[priority]).parts)
+        self._desktop_ids[path] = desktop_id
+        self._sources.setdefault(desktop_id, {})[priority] = path
+
+        return desktop_id
+
+    def _update_source(self, priority: int, path: Path) -> None:
+        desktop_id = self._add_source(priority, path)
+
+        # files shadowed by another directory do not change the visible app
+        if self._get_visible_path(desktop_id) == path:
+            self.loader.load_path(path, self._on_loaded)
+
+    def _remove_source(self, priority: int, path: Path) -> None:
+        desktop_id = self._desktop_ids.pop(path)
+        sources = self._sources[desktop_id]
+        was_visible = self._get_visible_path(desktop_id) == path
+
+        sources.pop(priority, None)
+        self.loader.forget(path)
+
+        if len(sources) == 0:
+            self._sources.pop(desktop_id)
+
+        if was_visible:
+            self._set_app(desktop_id, None)
+            if len(sources) != 0:
+                # the file it shadowed becomes visible
+                self.loader.load_path(
+                    self._get_visible_path(desktop_id), self._on_loaded
+                )
+
+    def _get_visible_path(self, desktop_id: str) -> Path:
+        sources = self._sources[desktop_id]
+
+        return sources[min(sources)]
+
+    def _on_loaded(self, path: Path, app: DesktopApp | None) -> None:
+        desktop_id = self._desktop_ids.get(path)
+
+        # removed or shadowed while it was being parsed
+        if desktop_id is None or self._get_visible_path(desktop_id) != path:
+            return
+
+        self._set_app(desktop_id, app)
+
+    def _set_app(self, desktop_id: str, app: DesktopApp | None) -> None:
+        previous_app = self.apps.pop(desktop_id, None)
+        if previous_app is not None:
+            self.on_app_removed(previous_app)
+
+        if app is not None:
+            self.apps[desktop_id] = app
+            self.on_app_added(app)
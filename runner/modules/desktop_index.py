@@ -0,0 +1,109 @@
+import json
+import os
+from pathlib import Path
+
+from loguru import logger
+
+from modules.desktop_app import LOCALE_SUFFIXES
+
+INDEX_FILE_PATH = "/home/cody/.shell/runner_index.json"
+
+# bump whenever the fields stored per entry change so old indexes get rebuilt
+INDEX_VERSION = 3
+
+
+class DesktopIndex:
+    """
+    On-disk cache of parsed desktop files keyed by path. Each entry remembers
+    the mtime and size of the file it was parsed from, so revalidating only
+    needs a stat per file and only changed files get reparsed.
+    Not thread safe, only use it from the main thread.
+    """
+
+    def __init__(self, path: str = INDEX_FILE_PATH):
+        self._path = Path(path)
+        self._entries: dict[str, dict] = {}
+        self._dirty = False
+
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            index = json.loads(self._path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read runner desktop index, rebuilding it. {e}")
+            return
+
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+            logger.info("Runner desktop index is outdated, rebuilding it.")
+            return
+
+        # localized values were picked for the locale the index was built in
+        if index.get("locale") != LOCALE_SUFFIXES:
+            logger.info("Locale changed since the runner desktop index was built.")
+            return
+
+        self._entries = index["entries"]
+
+    def get(self, path: Path, stat: os.stat_result) -> dict | None:
+        """
+        Returns the indexed fields for a desktop file, or None if the file is
+        new or its mtime or size differ from the indexed entry.
+        """
+        entry = self._entries.get(str(path))
+
+        if (
+            entry is None
+            or entry["mtime"] != stat.st_mtime_ns
+            or entry["size"] != stat.st_size
+        ):
+            return None
+
+        return entry["fields"]
+
+    def put(self, path: Path, stat: os.stat_result, fields: dict) -> None:
+        self._entries[str(path)] = {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "fields": fields,
+        }
+        self._dirty = True
+
+    def remove(self, path: Path) -> None:
+        if self._entries.pop(str(path), None) is not None:
+            self._dirty = True
+
+    def retain(self, paths: list[Path]) -> None:
+        """Drops entries for desktop files that are no longer installed."""
+        keys = {str(path) for path in paths}
+
+        for key in self._entries.keys() - keys:
+            self._entries.pop(key)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Writes the index to disk if anything changed since it was loaded."""
+        if not self._dirty:
+            return
+
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w") as file:
+                json.dump(
+                    {
+                        "version": INDEX_VERSION,
+                        "locale": LOCALE_SUFFIXES,
+                        "entries": self._entries,
+                    },
+                    file,
+                )
+            # replace is atomic, a crash mid write never leaves a corrupt index
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.error(f"Could not write runner desktop index. {e}")
+        else:
+            self._dirty = False
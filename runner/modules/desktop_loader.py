@@ -0,0 +1,154 @@
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from gi.repository import GLib
+from helpers import get_icon_cache
+from loguru import logger
+from util.icon_cache import load_pixbuf
+
+from modules.desktop_app import ICON_HEIGHT, ICON_WIDTH, DesktopApp
+from modules.desktop_index import DesktopIndex
+
+LOADER_WORKERS = 4
+
+
+class DesktopAppLoader:
+    """
+    Parses desktop files and decodes app icons on a worker pool. Results are
+    handed back to the GTK main loop with GLib.idle_add, so callbacks are
+    always invoked on the main thread.
+    """
+
+    def __init__(self):
+        self.index = DesktopIndex()
+        self.executor = ThreadPoolExecutor(
+            max_workers=LOADER_WORKERS, thread_name_prefix="runner-loader"
+        )
+        self.icon_cache = get_icon_cache()
+        self._pending_parses = 0
+
+    def load(
+        self, paths: list[Path], on_loaded: Callable[[Path, DesktopApp | None], None]
+    ) -> list[DesktopApp]:
+        """
+        Returns the apps whose index entries are still valid right away.
+        Files that are new or changed are parsed in the pool and passed to
+        on_loaded as they finish, with None for entries that are not shown.
+        """
+        apps = []
+
+        for path in paths:
+            fields = self._lookup(path, on_loaded)
+            if fields is None:
+                continue
+
+            # hidden entries are dropped before their icons are ever decoded
+            app = DesktopApp.from_fields(path, fields)
+            if app is not None:
+                apps.append(app)
+
+        self.index.retain(paths)
+        self._save_index()
+
+        return apps
+
+    def load_path(
+        self, path: Path, on_loaded: Callable[[Path, DesktopApp | None], None]
+    ) -> None:
+        """
+        Loads a single desktop file, on_loaded is called right away if its
+        index entry is still valid.
+        """
+        fields = self._lookup(path, on_loaded)
+        if fields is not None:
+            on_loaded(path, DesktopApp.from_fields(path, fields))
+
+    def forget(self, path: Path) -> None:
+        """Drops the index entry of a desktop file that was removed."""
+        self.index.remove(path)
+        self._save_index()
+
+    def _lookup(self, path: Path, on_loaded: Callable) -> dict | None:
+        """
+        Returns the indexed fields of a desktop file, or None after queueing
+        a parse if the file is new or changed.
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        fields = self.index.get(path, stat)
+        if fields is None:
+            self._pending_parses += 1
+            self.executor.submit(DesktopApp.parse, path).add_done_callback(
+                lambda future: GLib.idle_add(
+                    self._on_parsed, path, stat, future, on_loaded
+                )
+            )
+
+        return fields
+
+    def _on_parsed(self, path, stat, future: Future, on_loaded: Callable):
+        self._pending_parses -= 1
+
+        try:
+            fields = future.result()
+        except OSError as e:
+            logger.error(f"Could not parse desktop file {path}: {e}")
+            on_loaded(path, None)
+        else:
+            self.index.put(path, stat, fields)
+            on_loaded(path, DesktopApp.from_fields(path, fields))
+
+        self._save_index()
+
+        return False
+
+    def _save_index(self) -> None:
+        # parses still in flight would dirty the index again right away
+        if self._pending_parses == 0:
+            self.index.save()
+
+    def load_icon(
+        self, app: DesktopApp, on_icon_loaded: Callable[[DesktopApp], None]
+    ) -> None:
+        """
+        Looks up the icon of an app on the main thread, since the icon theme
+        is not thread safe, and decodes it in the pool unless it is cached.
+        """
+        if app.icon is None:
+            return
+
+        key = self.icon_cache.make_key(app.icon, ICON_WIDTH, ICON_HEIGHT)
+        found, pixbuf = self.icon_cache.get_cached(key)
+        if found:
+            app.icon_pixbuf = pixbuf
+            if pixbuf is not None:
+                on_icon_loaded(app)
+            return
+
+        icon_path = self.icon_cache.lookup_path(app.icon, ICON_WIDTH)
+        if icon_path is None:
+            self.icon_cache.put(key, None)
+            return
+
+        self.executor.submit(
+            load_pixbuf, icon_path, ICON_WIDTH, ICON_HEIGHT
+        ).add_done_callback(
+            lambda future: GLib.idle_add(
+                self._on_icon_decoded, app, key, future, on_icon_loaded
+            )
+        )
+
+    def _on_icon_decoded(
+        self, app: DesktopApp, key: tuple, future: Future, on_icon_loaded
+    ):
+        app.icon_pixbuf = future.result()
+        self.icon_cache.put(key, app.icon_pixbuf)
+
+        if app.icon_pixbuf is not None:
+            on_icon_loaded(app)
+
+        return False
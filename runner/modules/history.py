@@ -0,0 +1,162 @@
+import json
+import os
+import time
+from pathlib import Path
+
+from loguru import logger
+
+HISTORY_LOG_PATH = "/home/cody/.shell/runner_history.jsonl"
+# recent apps list written by older versions, imported once
+LEGACY_HISTORY_FILE_PATH = "/home/cody/.shell/runner_history.json"
+
+# a launch loses half of its weight every week
+HALF_LIFE = 7 * 24 * 60 * 60
+# apps whose score decayed below this are dropped when the log is compacted
+MIN_SCORE = 0.01
+# the log is compacted once it holds this many more lines than apps
+COMPACT_SLACK = 200
+
+
+class HistoryEntry:
+    __slots__ = ("count", "score", "time")
+
+    def __init__(self, score: float = 0.0, time: float = 0.0, count: int = 0):
+        self.score = score
+        self.time = time
+        self.count = count
+
+    def decayed(self, now: float) -> float:
+        return self.score * 2 ** ((self.time - now) / HALF_LIFE)
+
+    def record(self, now: float) -> None:
+        self.score = self.decayed(now) + 1
+        self.time = now
+        self.count += 1
+
+
+class LaunchHistory:
+    """
+    Frecency store for launched apps. Every launch adds one to an app's
+    score and scores decay exponentially, so apps used often and recently
+    rank first.
+
+    Launches are appended to a log of JSON lines. Once the log grows well
+    past one line per app it is compacted into a snapshot line per app,
+    written to a temporary file and swapped in atomically.
+    Not thread safe, only use it from the main thread.
+    """
+
+    def __init__(self, path: str = HISTORY_LOG_PATH):
+        self._path = Path(path)
+        self._entries: dict[str, HistoryEntry] = {}
+        self._log_lines = 0
+
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with self._path.open() as file:
+                for line in file:
+                    self._log_lines += 1
+                    self._apply(line)
+        except FileNotFoundError:
+            self._import_legacy_history()
+            return
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"Could not read runner launch history. {e}")
+            return
+
+        if self._log_lines > len(self._entries) + COMPACT_SLACK:
+            self.compact()
+
+    def _apply(self, line: str) -> None:
+        try:
+            record = json.loads(line)
+            key = record["key"]
+            entry = self._entries.setdefault(key, HistoryEntry())
+
+            if "score" in record:
+                # snapshot written by compact
+                entry.score = record["score"]
+                entry.time = record["time"]
+                entry.count = record["count"]
+            else:
+                entry.record(record["time"])
+        except (ValueError, KeyError, TypeError):
+            # a crash mid append can leave a torn last line
+            logger.warning(f"Skipping malformed runner history line: {line!r}")
+
+    def _import_legacy_history(self) -> None:
+        try:
+            recent = json.loads(Path(LEGACY_HISTORY_FILE_PATH).read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not import old runner history. {e}")
+            return
+
+        now = time.time()
+        # most recent first, keep that order by launching it last
+        for offset, key in enumerate(reversed(recent)):
+            self._entries.setdefault(key, HistoryEntry()).record(
+                now - len(recent) + offset
+            )
+
+        self.compact()
+
+    def score(self, key: str, now: float | None = None) -> float:
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0.0
+
+        return entry.decayed(time.time() if now is None else now)
+
+    def scores(self) -> dict[str, float]:
+        """Current score of every app that has been launched."""
+        now = time.time()
+
+        return {key: entry.decayed(now) for key, entry in self._entries.items()}
+
+    def record(self, key: str) -> None:
+        now = time.time()
+        self._entries.setdefault(key, HistoryEntry()).record(now)
+
+        try:
+            with self._path.open("a") as file:
+                file.write(json.dumps({"key": key, "time": now}) + "\n")
+        except OSError as e:
+            logger.error(f"Could not write runner launch history. {e}")
+            return
+
+        self._log_lines += 1
+        if self._log_lines > len(self._entries) + COMPACT_SLACK:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrites the log as one snapshot line per app."""
+        now = time.time()
+        self._entries = {
+            key: entry
+            for key, entry in self._entries.items()
+            if entry.decayed(now) >= MIN_SCORE
+        }
+
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w") as file:
+                for key, entry in self._entries.items():
+                    record = {
+                        "key": key,
+                        "score": entry.score,
+                        "time": entry.time,
+                        "count": entry.count,
+                    }
+                    file.write(json.dumps(record) + "\n")
+            # replace is atomic, a crash mid write never loses the old log
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.error(f"Could not compact runner launch history. {e}")
+        else:
+            self._log_lines = len(self._entries)
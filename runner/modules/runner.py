@@ -1,20 +1,22 @@
 from fabric.widgets.wayland import WaylandWindow as Window
-from fabric.widgets.scrolledwindow import ScrolledWindow
 from fabric.widgets.box import Box
 from fabric.widgets.entry import Entry
 
-from pathlib import Path
+from gi.repository import Gio, GLib
+from loguru import logger
+
+import os
+from ipc import SOCKET_PATH, SHOW_COMMAND
 from modules.desktop_app import DesktopApp
-from modules.app_element import AppElement, AppElementList
+from modules.desktop_catalog import DesktopCatalog
+from modules.desktop_loader import DesktopAppLoader
+from modules.app_list import AppList, AppListView
 
 
 ENTER_KEY_CODE = 65293
 ESCAPE_KEY_CODE = 65307
 UP_ARROW_KEY_CODE = 65362
 DOWN_ARROW_KEY_CODE = 65364
-APPLICATION_DIR = Path("/usr/share/applications")
-if not APPLICATION_DIR.exists() or not APPLICATION_DIR.is_dir():
-    raise FileNotFoundError("GTK user applications directory does not exist.")
 
 
 class Runner(Window):
@@ -37,20 +39,19 @@ class Runner(Window):
         )
         self.search_entry.connect("notify::text", self.on_notify_search_text)
 
-        app_elements = self.get_app_elements()
-        self.app_element_list = AppElementList(app_elements)
-
-        self.app_list_box = Box(
-            spacing=20,
-            orientation="v",
-            v_expand=True,
-            name="app-list",
-            children=self.app_element_list.get_all_elements(),
+        self.desktop_app_loader = DesktopAppLoader()
+        self.desktop_catalog = DesktopCatalog(
+            self.desktop_app_loader, self.on_app_added, self.on_app_removed
         )
-        self.scrolled_window = ScrolledWindow(
+        self._refresh_id = None
+
+        apps = self.desktop_catalog.scan()
+        self.app_list = AppList(apps)
+
+        self.app_list_view = AppListView(
+            self.launch_app,
             name="runner-scrolled-window",
-            v_align=True,
-            child=self.app_list_box,
+            v_expand=True,
         )
 
         self.add(
@@ -59,7 +60,7 @@ class Runner(Window):
                 orientation="v",
                 children=[
                     self.search_entry,
-                    self.scrolled_window,
+                    self.app_list_view,
                 ],
             )
         )
@@ -67,80 +68,141 @@ class Runner(Window):
         # Grab focus here so the entry is realized and mapped
         self.search_entry.grab_focus()
 
-        self.selected_app_index = 0
-        self.select_app_element(index=self.selected_app_index)
+        self.app_list_view.set_apps(self.app_list.get_all_apps())
+
+        # decode icons once the window has text rows to show
+        GLib.idle_add(self.load_icons, apps)
+
+        self.socket_service = None
+        self.listen_for_commands()
+
+        self.connect("destroy", self.on_destroy)
+
+    def listen_for_commands(self) -> None:
+        """
+        Keeps the runner resident, later invocations signal this window over
+        a unix socket instead of starting a new process.
+        """
+        # main only gets here if nothing answered on the socket, so any file
+        # left at the path belongs to a runner that did not shut down cleanly
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)
+
+        self.socket_service = Gio.SocketService()
+        try:
+            self.socket_service.add_address(
+                Gio.UnixSocketAddress.new(SOCKET_PATH),
+                Gio.SocketType.STREAM,
+                Gio.SocketProtocol.DEFAULT,
+                None,
+            )
+        except GLib.Error as e:
+            logger.error(f"Could not listen on runner socket {SOCKET_PATH}: {e}")
+            self.socket_service = None
+            return
+
+        self.socket_service.connect("incoming", self.on_incoming_connection)
+        self.socket_service.start()
+
+    def on_incoming_connection(self, service, connection, source_object):
+        connection.get_input_stream().read_bytes_async(
+            64, GLib.PRIORITY_DEFAULT, None, self.on_command_read, connection
+        )
+        return True
+
+    def on_command_read(self, stream, result, connection):
+        try:
+            command = stream.read_bytes_finish(result).get_data().decode().strip()
+        except GLib.Error as e:
+            logger.warning(f"Could not read runner command: {e}")
+            return
+        finally:
+            connection.close(None)
+
+        if command == SHOW_COMMAND:
+            self.show_runner()
+        else:
+            logger.warning(f"Unknown runner command: {command}")
+
+    def on_destroy(self, *args):
+        if self.socket_service is not None:
+            self.socket_service.stop()
+            if os.path.exists(SOCKET_PATH):
+                os.unlink(SOCKET_PATH)
+
+    def show_runner(self) -> None:
+        self.reset()
+        self.show()
+        self.search_entry.grab_focus()
+
+    def hide_runner(self) -> None:
+        self.hide()
+
+    def reset(self) -> None:
+        # frecency decays while the runner stays resident
+        self.app_list.update_boosts()
+
+        if self.search_entry.get_text() != "":
+            # the text notify handler restores the full list
+            self.search_entry.set_text("")
+        else:
+            # history may have changed since the list was last built
+            self.on_notify_search_text()
 
     def on_key_press(self, widget, event):
         if event.keyval == ESCAPE_KEY_CODE:
-            exit(0)
+            self.hide_runner()
         elif event.keyval == ENTER_KEY_CODE:
             self.run_selected_app()
         elif event.keyval == UP_ARROW_KEY_CODE:
-            new_index = max(0, self.selected_app_index - 1)
-            self.select_app_element(new_index)
+            self.app_list_view.select(self.app_list_view.selected_index - 1)
         elif event.keyval == DOWN_ARROW_KEY_CODE:
-            new_index = min(
-                len(self.app_list_box.children) - 1, self.selected_app_index + 1
-            )
-            self.select_app_element(new_index)
+            self.app_list_view.select(self.app_list_view.selected_index + 1)
 
         return False
 
-    def select_app_element(self, index):
-        if index < 0 or index >= len(self.app_list_box.children):
-            raise ValueError(
-                "Invalid index passed! If you believe this is an error, check if there are any app elements loaded."
-            )
-
-        app_elements = self.app_list_box.children
-        previous_selected_app = app_elements[self.selected_app_index]
-        previous_selected_app.remove_style_class("selected-element")
-
-        new_selected_app = app_elements[index]
-        new_selected_app.add_style_class("selected-element")
-        self.selected_app_index = index
-
-        vadjustment = self.scrolled_window.get_vadjustment()
-        scroll_multiplier = 90
-        vadjustment.set_value(self.selected_app_index * scroll_multiplier)
-
     def run_selected_app(self):
-        selected_app = self.app_list_box.children[self.selected_app_index]
-        selected_app.run_app()
-        exit(0)
+        app = self.app_list_view.get_selected_app()
+        if app is not None:
+            self.launch_app(app)
+
+    def launch_app(self, app: DesktopApp) -> None:
+        app.launch()
+        self.app_list.record_launch(app)
+        self.hide_runner()
 
     def on_notify_search_text(self, *args):
         query = self.search_entry.get_text()
-        if query == "":
-            self.app_list_box.children = self.app_element_list.get_all_elements()
-            return
-
-        selected_app = self.app_list_box.children[self.selected_app_index]
-        selected_app.remove_style_class("selected-element")
-        self.app_list_box.children = self.app_element_list.search(query)
-        self.select_app_element(0)
 
-    def get_app_elements(self) -> list[AppElement]:
-        paths = self.get_app_paths()
+        if query == "":
+            self.app_list_view.set_apps(self.app_list.get_all_apps())
+        else:
+            self.app_list_view.set_apps(self.app_list.search(query))
 
-        desktop_apps = self.get_desktop_apps(paths)
+    def on_app_added(self, app: DesktopApp) -> None:
+        self.app_list.add(app)
+        self.desktop_app_loader.load_icon(app, self.app_list_view.refresh_app)
+        self.queue_refresh()
 
-        return [
-            AppElement(app, lambda name: self.app_element_list.record_history(name))
-            for app in desktop_apps
-        ]
+    def on_app_removed(self, app: DesktopApp) -> None:
+        self.app_list.remove(app)
+        self.queue_refresh()
 
-    def get_app_paths(self) -> list[Path]:
-        paths = []
+    def load_icons(self, apps: list[DesktopApp]) -> bool:
+        for app in apps:
+            self.desktop_app_loader.load_icon(app, self.app_list_view.refresh_app)
 
-        for posix_path in APPLICATION_DIR.glob("*.desktop"):
-            if not posix_path.is_file():
-                return
+        return False
 
-            path = posix_path.resolve()
-            paths.append(path)
+    def queue_refresh(self) -> None:
+        """Rebuilds the list once after a burst of added or removed apps."""
+        if self._refresh_id is not None:
+            return
 
-        return paths
+        def refresh():
+            self._refresh_id = None
+            self.on_notify_search_text()
+            return False
 
-    def get_desktop_apps(self, paths: list[Path]) -> list[DesktopApp]:
-        return [DesktopApp.from_path(path) for path in paths]
+        # low priority so apps that are already queued get added first
+        self._refresh_id = GLib.idle_add(refresh, priority=GLib.PRIORITY_LOW)
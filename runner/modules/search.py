@@ -0,0 +1,572 @@
+import heapq
+import re
+import unicodedata
+from bisect import bisect_right
+from itertools import accumulate, repeat
+from operator import add
+
+SEARCH_RESULT_LIMIT = 50
+
+# multi token queries look every token up directly on the lines that can
+# match them all while those are at most this many times the limit
+DIRECT_MATCH_FACTOR = 4
+
+# Match tiers, lower is better. Every entry a token matches falls into the
+# best tier it qualifies for, a better tier always outranks a worse one and
+# entries within a tier are ordered by a tier specific key.
+EXACT_TIER = 0
+PREFIX_TIER = 1
+WORD_PREFIX_TIER = 2
+ACRONYM_TIER = 3
+SUBSTRING_TIER = 4
+SUBSEQUENCE_TIER = 5
+SECONDARY_PREFIX_TIER = 6
+SECONDARY_SUBSTRING_TIER = 7
+
+# separate word suffixes and secondary fields, these never show up in a query
+# since queries are split on whitespace
+FIELD_SEPARATOR = "\t"
+
+SECONDARY_WORD_SEPARATORS = (FIELD_SEPARATOR, " ", "-", "_")
+
+
+def normalize(text: str) -> str:
+    """Case folds text and strips accents so "é" matches "e"."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class SearchEntry:
+    """Search data for one app, computed once when the app is added."""
+
+    __slots__ = ("acronym", "key", "name", "secondary", "sort_key", "words")
+
+    def __init__(self, key, name: str, secondary: list[str]):
+        self.key = key
+
+        # word boundaries are split on anything that is not alphanumeric and
+        # on camel case humps, so "LibreOffice Calc" has words libre office calc.
+        # Characters are normalized one at a time so the boundary offsets
+        # line up with the normalized name.
+        normalized = []
+        length = 0
+        word_starts = []
+        previous = ""
+        for char in name:
+            folded = normalize(char)
+            if folded == "":
+                continue
+
+            if char.isalnum() and (
+                not previous.isalnum()
+                or (char.isupper() and previous.islower())
+                or char.isdigit() != previous.isdigit()
+            ):
+                word_starts.append(length)
+
+            normalized.append(folded)
+            length += len(folded)
+            previous = char
+
+        self.name = "".join(normalized).replace(FIELD_SEPARATOR, " ")
+        # indexes keep entries in this order
+        self.sort_key = (len(self.name), self.name)
+        # every word suffix after a separator, the first word is the whole
+        # name and prefixes of it are handled as plain prefix matches
+        self.words = "".join(
+            FIELD_SEPARATOR + self.name[start:] for start in word_starts if start != 0
+        )
+        self.acronym = "".join(self.name[start] for start in word_starts)
+        self.secondary = FIELD_SEPARATOR.join(
+            normalize(text).replace(FIELD_SEPARATOR, " ") for text in secondary if text
+        )
+
+
+class SearchEngine:
+    """
+    Fuzzy matcher over app names. Names, word boundaries, acronyms and
+    secondary fields like generic names, keywords and the executable are
+    normalized once when an app is added.
+
+    While the user types, a query that extends the previous one can only
+    match apps the previous query matched, so the next search only scans
+    those. Deleting characters falls back to a search over every app.
+
+    Boosted apps, like frequently launched ones, rank up to their boost in
+    tiers higher. They are few, so they are kept in an index of their own
+    that is always searched in full.
+    """
+
+    def __init__(self):
+        self._entries: dict = {}
+        self._index: SearchIndex | None = None
+
+        self._boosts: dict = {}
+        self._boosted_index: SearchIndex | None = None
+
+        self._last_query = None
+        # entries the last query matched, indexed once the next query needs them
+        self._narrowed_entries: list[SearchEntry] | None = None
+        self._narrowed_index: SearchIndex | None = None
+
+    def add(self, key, name: str, secondary: list[str] | None = None) -> None:
+        self._entries[key] = SearchEntry(key, name, secondary or [])
+        self._invalidate()
+
+    def remove(self, key) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._invalidate()
+
+    def set_boosts(self, boosts: dict) -> None:
+        """Sets how many tiers higher the apps with the given keys rank."""
+        self._boosts = {key: boost for key, boost in boosts.items() if boost > 0}
+        self._boosted_index = None
+
+    def search(self, query: str, limit: int = SEARCH_RESULT_LIMIT) -> list:
+        """Returns the keys of the best matches, best first."""
+        query = normalize(query)
+        tokens = query.split()
+        if len(tokens) == 0:
+            self._last_query = None
+            self._narrowed_entries = None
+            self._narrowed_index = None
+            return []
+
+        if self._index is None:
+            self._index = SearchIndex(list(self._entries.values()))
+        if self._boosted_index is None:
+            self._boosted_index = SearchIndex(
+                [self._entries[key] for key in self._boosts if key in self._entries]
+            )
+
+        if self._narrowed_entries is not None and query.startswith(self._last_query):
+            if self._narrowed_index is None:
+                self._narrowed_index = SearchIndex(
+                    self._narrowed_entries, is_sorted=True
+                )
+            index = self._narrowed_index
+        else:
+            index = self._index
+
+        ranked, candidates = index.search(
+            tokens, limit, self._boosts, self._boosted_index
+        )
+
+        self._last_query = query
+        # candidates are only known when the match did not stop early, in
+        # which case the full index is cheap to search again anyway
+        self._narrowed_entries = candidates
+        if candidates is None or len(candidates) != len(index):
+            self._narrowed_index = None
+        else:
+            self._narrowed_index = index
+
+        return [entry.key for entry in ranked]
+
+    def _invalidate(self) -> None:
+        self._index = None
+        self._boosted_index = None
+        self._last_query = None
+        self._narrowed_entries = None
+        self._narrowed_index = None
+
+
+class SearchIndex:
+    """
+    A fixed set of search entries joined into newline separated texts, one
+    line per entry. A query token is matched tier by tier with compiled
+    regexes over those texts, so the per entry work happens in C and
+    matching stops as soon as the best tiers hold enough results.
+    """
+
+    def __init__(self, entries: list[SearchEntry], is_sorted: bool = False):
+        if not is_sorted:
+            entries = sorted(entries, key=lambda entry: entry.sort_key)
+
+        self._entries = entries
+        self._lengths = [len(entry.name) for entry in entries]
+        self._names_text, self._name_starts = self._join(
+            [entry.name for entry in entries]
+        )
+        self._words_text, self._word_starts = self._join(
+            [entry.words for entry in entries]
+        )
+        self._acronyms_text, self._acronym_starts = self._join(
+            [entry.acronym for entry in entries]
+        )
+        self._secondary_text, self._secondary_starts = self._join(
+            [entry.secondary for entry in entries]
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(
+        self,
+        tokens: list[str],
+        limit: int,
+        boosts: dict,
+        boosted_index: "SearchIndex",
+    ) -> tuple[list[SearchEntry], list[SearchEntry] | None]:
+        """
+        Returns the best entries matching every token, best first, and every
+        matching entry if the search did not have to stop early.
+        """
+
+        # ties are broken the way entries are sorted, so results do not
+        # depend on which index an entry was found in
+        def rank_key(entry, order):
+            return (
+                order[0] - boosts.get(entry.key, 0),
+                order[1:],
+                entry.sort_key,
+            )
+
+        if len(tokens) == 1:
+            matches, complete = self._match_token(tokens[0], limit)
+            # boosted entries can outrank tiers the limited match skipped
+            boosted_matches = {}
+            if boosts:
+                boosted_matches, _ = boosted_index._match_token(tokens[0])
+        else:
+            matches, complete = self._match_tokens(tokens, limit)
+            boosted_matches = {}
+            if boosts:
+                boosted_matches, _ = boosted_index._match_tokens(tokens)
+
+        entries = self._entries
+        orders = {entries[index]: order for index, order in matches.items()}
+        for index, order in boosted_matches.items():
+            orders[boosted_index._entries[index]] = order
+
+        # sorting plain tuples is cheaper than a heap with a key function,
+        # the position breaks ties so entries are never compared
+        keyed = sorted(
+            (rank_key(entry, order), position, entry)
+            for position, (entry, order) in enumerate(orders.items())
+        )
+        ranked = [entry for _, _, entry in keyed[:limit]]
+        if not complete:
+            return ranked, None
+
+        return ranked, [entries[index] for index in sorted(matches)]
+
+    def _join(self, lines: list[str]) -> tuple[str, list[int]]:
+        """
+        Joins lines with newlines and returns the offset each line starts at.
+        Every line, the first one too, follows a newline, so line prefixes
+        are found by searching for a newline and the prefix, which is a fast
+        literal scan unlike a multiline "^".
+        """
+        starts = list(accumulate(map(add, map(len, lines), repeat(1)), initial=1))
+        starts.pop()
+        return "\n" + "\n".join(lines), starts
+
+    def _match_token(self, token: str, limit: int | None = None) -> tuple[dict, bool]:
+        """
+        Maps the index of every entry the token matches to its
+        (tier, order key). With a limit, tiers that can not make it into the
+        top results are skipped. Also returns whether every matching entry
+        was found.
+        """
+        # once every entry matched, later tiers can not change anything
+        full = len(self) if limit is None else min(limit, len(self))
+
+        matches = {}
+        for index, order in self._iter_matches(token):
+            matches[index] = order
+            # matches arrive best first, the remaining ones rank lower
+            if len(matches) >= full:
+                return matches, len(matches) == len(self)
+
+        return matches, True
+
+    def _match_tokens(
+        self, tokens: list[str], limit: int | None = None
+    ) -> tuple[dict, bool]:
+        """
+        Maps the index of every entry all tokens match to its summed tier.
+        With a limit, matching stops once the best results are known. Also
+        returns whether every matching entry was found.
+
+        Tokens longer than a character only match lines they occur in as a
+        subsequence of the name or in the secondary fields, which is cheap to
+        find in C. When few lines hold all of them, those are looked up for
+        every token directly.
+
+        Otherwise the matches of every token are read best first, a step per
+        token at a time, and an entry is looked up for the other tokens the
+        first time it shows up. Entries that did not show up yet rank at
+        least as low as the tiers the tokens are currently at summed, so once
+        enough entries rank better the rest can be skipped.
+        """
+        classifiers = [self._get_classifier(token) for token in tokens]
+        entries = self._entries
+
+        # longer tokens match fewer lines, once those are few enough looking
+        # them up directly is cheaper than finding the lines of the rest
+        candidates = None
+        for token in sorted(tokens, key=len, reverse=True):
+            if len(token) == 1 or (
+                candidates is not None
+                and limit is not None
+                and len(candidates) <= limit
+            ):
+                break
+            lines = self._find_lines(token)
+            candidates = lines if candidates is None else candidates & lines
+
+        if candidates is not None and (
+            limit is None or len(candidates) <= DIRECT_MATCH_FACTOR * limit
+        ):
+            matches = {}
+            for index in candidates:
+                tier = 0
+                for classify in classifiers:
+                    order = classify(entries[index])
+                    if order is None:
+                        break
+                    tier += order[0]
+                else:
+                    matches[index] = (tier,)
+            return matches, True
+
+        streams = [self._iter_matches(token) for token in tokens]
+        others = [
+            [
+                classify
+                for other, classify in enumerate(classifiers)
+                if other != position
+            ]
+            for position in range(len(tokens))
+        ]
+        floors = [EXACT_TIER] * len(tokens)
+
+        matches = {}
+        seen = set()
+        # negated sums of the best matches so far, the worst one on top
+        best = []
+        while True:
+            for position, stream in enumerate(streams):
+                item = next(stream, None)
+                # every entry this token matches was seen, so was every
+                # entry all tokens match
+                if item is None:
+                    return matches, True
+
+                index, order = item
+                tier = floors[position] = order[0]
+                if index in seen:
+                    continue
+                seen.add(index)
+                if candidates is not None and index not in candidates:
+                    continue
+
+                for classify in others[position]:
+                    other_order = classify(entries[index])
+                    if other_order is None:
+                        break
+                    tier += other_order[0]
+                else:
+                    matches[index] = (tier,)
+                    if limit is not None:
+                        if len(best) < limit:
+                            heapq.heappush(best, -tier)
+                        elif -tier > best[0]:
+                            heapq.heapreplace(best, -tier)
+
+            if limit is not None and len(best) == limit and -best[0] < sum(floors):
+                # matches ranking below the best ones are never shown
+                worst = -best[0]
+                matches = {
+                    index: order
+                    for index, order in matches.items()
+                    if order[0] <= worst
+                }
+                return matches, False
+
+    def _iter_matches(self, token: str):
+        """
+        Yields the index and (tier, order key) of every entry the token
+        matches, best first. Entries are stored shortest name first, which is
+        the order within tiers that order by length.
+        """
+        escaped = re.escape(token)
+        lengths = self._lengths
+        found = set()
+        # a single character tends to occur several times in one entry
+        repeats = len(token) == 1
+
+        # exact matches are the shortest prefix matches, so they come first
+        prefix = re.compile("\n" + escaped)
+        for index, _ in self._scan(prefix, self._names_text, self._name_starts, False):
+            found.add(index)
+            tier = EXACT_TIER if lengths[index] == len(token) else PREFIX_TIER
+            yield index, (tier, lengths[index])
+
+        word_prefix = re.compile(FIELD_SEPARATOR + escaped)
+        for index, _ in self._scan(
+            word_prefix, self._words_text, self._word_starts, repeats
+        ):
+            if index not in found:
+                found.add(index)
+                yield index, (WORD_PREFIX_TIER, lengths[index])
+
+        if len(token) > 1:
+            for index, _ in self._scan(
+                prefix, self._acronyms_text, self._acronym_starts, False
+            ):
+                if index not in found:
+                    found.add(index)
+                    yield index, (ACRONYM_TIER, lengths[index])
+
+        substring = re.compile(escaped)
+        for index, _ in self._scan(
+            substring, self._names_text, self._name_starts, repeats
+        ):
+            if index not in found:
+                found.add(index)
+                yield index, (SUBSTRING_TIER, lengths[index])
+
+        if len(token) > 1:
+            subsequence = self._get_subsequence_pattern(token)
+            subsequences = []
+            for index, match in self._scan(
+                subsequence, self._names_text, self._name_starts, False
+            ):
+                if index not in found:
+                    found.add(index)
+                    subsequences.append(
+                        (match.end() - match.start() - len(token), index)
+                    )
+
+            # ordered by gaps first, the index orders by length and name
+            subsequences.sort()
+            for gaps, index in subsequences:
+                yield index, (SUBSEQUENCE_TIER, gaps, lengths[index])
+
+        # prefix matches start a field or follow a word separator, a line
+        # whose first occurrence is not one is searched for one up to its end
+        secondary_prefix = self._get_secondary_prefix_pattern(token)
+        text = self._secondary_text
+        starts = self._secondary_starts
+        secondary_prefixes = []
+        secondary_substrings = []
+        for index, match in self._scan(substring, text, starts, repeats):
+            if index in found:
+                continue
+
+            position = match.start()
+            end = starts[index + 1] - 1 if index + 1 < len(starts) else len(text)
+            if (
+                position == starts[index]
+                or secondary_prefix.search(text, position - 1, end) is not None
+            ):
+                secondary_prefixes.append(index)
+            else:
+                secondary_substrings.append(index)
+
+        for index in secondary_prefixes:
+            yield index, (SECONDARY_PREFIX_TIER, lengths[index])
+        for index in secondary_substrings:
+            yield index, (SECONDARY_SUBSTRING_TIER, lengths[index])
+
+    def _get_classifier(self, token: str):
+        """
+        Returns a function giving the (tier, order key) a token matches a
+        single entry with, or None, like _iter_matches does for every entry.
+        """
+        word_prefix = FIELD_SEPARATOR + token
+        subsequence = self._get_subsequence_pattern(token) if len(token) > 1 else None
+        secondary_prefix = self._get_secondary_prefix_pattern(token)
+
+        def classify(entry: SearchEntry) -> tuple | None:
+            name = entry.name
+            length = len(name)
+            if name.startswith(token):
+                return (EXACT_TIER if length == len(token) else PREFIX_TIER, length)
+            if word_prefix in entry.words:
+                return (WORD_PREFIX_TIER, length)
+            if subsequence is not None and entry.acronym.startswith(token):
+                return (ACRONYM_TIER, length)
+            if token in name:
+                return (SUBSTRING_TIER, length)
+            if subsequence is not None:
+                match = subsequence.search(name)
+                if match is not None:
+                    gaps = match.end() - match.start() - len(token)
+                    return (SUBSEQUENCE_TIER, gaps, length)
+
+            secondary = entry.secondary
+            if token not in secondary:
+                return None
+            if secondary.startswith(token) or secondary_prefix.search(secondary):
+                return (SECONDARY_PREFIX_TIER, length)
+            return (SECONDARY_SUBSTRING_TIER, length)
+
+        return classify
+
+    def _find_lines(self, token: str) -> set[int]:
+        """
+        Returns the index of every entry a token longer than a character
+        can match, its name holds the token as a subsequence or its
+        secondary fields hold it.
+        """
+        starts = self._name_starts
+        lines = {
+            bisect_right(starts, match.start()) - 1
+            for match in self._get_subsequence_pattern(token).finditer(self._names_text)
+        }
+        starts = self._secondary_starts
+        lines.update(
+            bisect_right(starts, match.start()) - 1
+            for match in re.finditer(re.escape(token), self._secondary_text)
+        )
+        return lines
+
+    @staticmethod
+    def _get_subsequence_pattern(token: str) -> re.Pattern:
+        # every gap stops at the first occurrence of the next character,
+        # which finds the tightest span starting at the leftmost match
+        # without the backtracking of lazy gaps
+        return re.compile(
+            re.escape(token[0])
+            + "".join(
+                f"[^\\n{re.escape(char)}]*{re.escape(char)}" for char in token[1:]
+            )
+        )
+
+    @staticmethod
+    def _get_secondary_prefix_pattern(token: str) -> re.Pattern:
+        return re.compile(
+            "[" + re.escape("".join(SECONDARY_WORD_SEPARATORS)) + "]" + re.escape(token)
+        )
+
+    def _scan(
+        self, pattern: re.Pattern, text: str, starts: list[int], skip_lines: bool
+    ):
+        """
+        Yields the index of every line the pattern matches with its first
+        match on that line. With skip_lines the search starts over at the
+        next line after a match, which is cheaper when lines match many
+        times but costs a new search per line otherwise.
+        """
+        if not skip_lines:
+            previous = None
+            for match in pattern.finditer(text):
+                # patterns may start at the newline in front of a line
+                index = bisect_right(starts, match.start() + 1) - 1
+                if index != previous:
+                    previous = index
+                    yield index, match
+            return
+
+        search = pattern.search
+        match = search(text)
+        while match is not None:
+            index = bisect_right(starts, match.start() + 1) - 1
+            yield index, match
+
+            if index + 1 == len(starts):
+                return
+            match = search(text, starts[index + 1] - 1)
@@ -0,0 +1,13 @@
+"""
+Makes the shell's util modules importable, the runner shares some of them,
+like the icon cache. Import this before importing from util.
+"""
+
+import sys
+from pathlib import Path
+
+SHELL_DIRECTORY = Path(__file__).resolve().parent.parent / "shell"
+
+# appended so the runner's own modules take precedence over the shell's
+if str(SHELL_DIRECTORY) not in sys.path:
+    sys.path.append(str(SHELL_DIRECTORY))
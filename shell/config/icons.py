@@ -92,6 +92,10 @@ volume_low: str = "&#xeb4f;"
 
 volume_off: str = "&#xeb50;"
 
+microphone: str = "&#xeaf0;"
+
+microphone_off: str = "&#xed16;"
+
 checkbox_unchecked: str = "&#xeb2c;"
 
 checkbox_checked: str = "&#xeb28;"
@@ -1,3 +1,5 @@
+from config.storage import STORAGE_DIRECTORY
+
 # HEADPHONE DEVICES
 # add more headphones by appending device description, shows different icon for
 # sinks in this list
@@ -6,10 +8,20 @@ HEADPHONES = [
     "bluez_output.88_08_94_15_DC_49.1",  # SK Hesh ANC
 ]
 
-VOLUME_AND_MUTED_UPDATE_INTERVAL = 100  # milliseconds
-
 # My bluetooth speak will present itself as a player
 # but does not provide full support for mpris properties. I
 # use this as a workaround for keeping playerctl from crashing
 # while I use my speaker. Will find a better way to do this in the future.
 UNSUPPORTED_PLAYER_NAMES = ["JBL_Charge_5"]
+
+# metadata a player sends within this window is applied once
+METADATA_COALESCE_MS = 16  # roughly a frame
+
+# ALBUM ART
+ART_SIZE = 40  # pixels
+# scaled art is cached here keyed by a hash of its url
+ART_CACHE_DIRECTORY = STORAGE_DIRECTORY + "art/"
+# oldest cached art is removed past this many files
+ART_CACHE_MAX_FILES = 256
+ART_FETCH_TIMEOUT = 5  # seconds
+ART_MAX_BYTES = 16 * 1024 * 1024
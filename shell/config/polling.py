@@ -0,0 +1,3 @@
+# each poll that reads an unchanged value multiplies the interval by this,
+# up to the task's max interval
+POLL_BACKOFF_FACTOR = 2
@@ -0,0 +1,13 @@
+METRICS_UPDATE_INTERVAL = 500  # milliseconds
+# polling backs off to this while no metric changes
+METRICS_MAX_UPDATE_INTERVAL = 4000  # milliseconds
+
+# windows metric tooltips show min, avg and max over, the longest one also
+# sizes the history kept per metric
+METRIC_HISTORY_WINDOWS = (60, 300, 900)  # seconds
+
+# mount point whose usage the disk indicator shows
+DISK_USAGE_PATH = "/"
+
+# index of the NVIDIA device the GPU indicator shows
+GPU_DEVICE_INDEX = 0
@@ -1,16 +1,21 @@
-import os
 from pathlib import Path
 
 from material_color_utilities import Variant
 
+from config.storage import STORAGE_DIRECTORY
 from util.theme import ThemeColors
 
-COLOR_STYLESHEET = os.getcwd() + "/shell/styles/colors.css"
+# wallpaper colors are written here for the runner, outside of the watched
+# styles so writing them does not reload every stylesheet
+THEME_COLORS_PATH = STORAGE_DIRECTORY + "theme_colors.css"
 
 WALLPAPERS_DIR = Path("~/Pictures/Wallpapers").expanduser()
 
 CURRENT_WALLPAPER_PATH = Path("~/Pictures/Wallpapers/current.png").expanduser()
 
+# files in the wallpaper directory with other suffixes are not listed
+WALLPAPER_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
 DEFAULT_COLOR_THEME = ThemeColors(
     "#8ad7a8",
     "#e6e0ec",
@@ -24,3 +29,18 @@ DEFAULT_COLOR_THEME = ThemeColors(
 DEFAULT_VARIANT = Variant.EXPRESSIVE
 
 DEFAULT_CONTRAST: float = 10.0
+
+# wallpapers are scaled down to fit this before colors are extracted
+THEME_IMAGE_SIZE = 128  # pixels
+
+# source colors of wallpaper themes, keyed by a hash of the image content
+PALETTE_CACHE_PATH = STORAGE_DIRECTORY + "palettes.json"
+PALETTE_CACHE_MAX_IMAGES = 64
+
+# WALLPAPER THUMBNAILS
+THUMBNAIL_WIDTH = 600
+THUMBNAIL_HEIGHT = 520
+# keyed by a hash of the wallpaper's path, modification time and size
+THUMBNAIL_DIRECTORY = STORAGE_DIRECTORY + "thumbnails/"
+# oldest thumbnails are removed past this many files
+THUMBNAIL_CACHE_MAX_FILES = 1024
@@ -1,7 +1,7 @@
 from loguru import logger
 import setproctitle
 from fabric import Application
-from fabric.utils import get_relative_path, monitor_file
+from fabric.utils import get_relative_path
 from modules.bar import Bar
 from modules.control_panel import ControlPanel
 from modules.notifications import NotificationPopUp
@@ -9,6 +9,7 @@ from modules.osd import VolumeOSD
 from services.theme import ThemeService
 
 from util.helpers import init_data_directory
+from util.style_manager import StyleManager
 from config.storage import STORAGE_DIRECTORY
 
 import asyncio
@@ -41,13 +42,8 @@ def main():
         open_inspector=False,
     )
 
-    def apply_stylesheet(*_):
-        return app.set_stylesheet_from_file(get_relative_path("main.css"))
-
-    style_monitor = monitor_file(get_relative_path("./styles"))
-    style_monitor.connect("changed", apply_stylesheet)
-
-    app.set_stylesheet_from_file(get_relative_path("main.css"))
+    style_manager = StyleManager(get_relative_path("main.css"))
+    style_manager.load()
 
     app.run()
 
@@ -3,12 +3,15 @@ from fabric.widgets.label import Label
 from fabric.widgets.button import Button
 from fabric.utils import truncate, bulk_connect
 
-from gi.repository import Playerctl, GdkPixbuf, GLib
+from gi.repository import Gtk, Playerctl, GdkPixbuf
 
 from services.media import MediaService
-from util.ui import add_hover_cursor, toggle_visible
-from util.helpers import get_file_path_from_mpris_url
-from config.media import HEADPHONES
+from util.album_art import AlbumArtLoader
+from util.track import TRACK_FIELDS, TrackMetadata
+from util.ui import add_hover_cursor
+from widgets.custom_image import CustomImage
+from widgets.playback_progress import PlaybackProgress
+from config.media import ART_SIZE, HEADPHONES
 import config.icons as Icons
 
 
@@ -23,6 +26,13 @@ class MediaControl(Box):
         )
 
         self.media_service = MediaService.get_instance()
+        self.art_loader = AlbumArtLoader.get_instance()
+
+        # url of the art that should be shown, art that finishes loading
+        # after the track changed again is dropped
+        self.art_url = ""
+        self.art = CustomImage(name="media-control-art", visible=False)
+        self.art.set_size_request(ART_SIZE, ART_SIZE)
 
         self.title = Label(
             name="info-box-title",
@@ -30,21 +40,29 @@ class MediaControl(Box):
         self.artist = Label(
             name="info-box-artist",
         )
+        self.progress = PlaybackProgress(
+            self.media_service.clock, name="media-progress"
+        )
         self.media_info = Box(
             name="info-box",
             orientation="v",
             v_align="center",
             v_expand=True,
             h_align="center",
-            children=[self.title, self.artist],
+            children=[self.title, self.artist, self.progress],
             visible=False,
         )
 
+        # left click swaps to the next sink, right click picks one
         self.output_control = Button(
             child=Label(style_classes="media-control-icon", markup=Icons.speaker),
             on_clicked=lambda *_: self.media_service.swap_speaker(),
         )
+        self.output_control.connect(
+            "button-press-event", self.on_output_control_button_press
+        )
         add_hover_cursor(self.output_control)
+        self.sink_picker = None
 
         self.prev_track_control = Button(
             child=Label(style_classes="media-control-icon", markup=Icons.skip_prev),
@@ -78,25 +96,41 @@ class MediaControl(Box):
         )
         add_hover_cursor(self.mute_control)
 
+        self.mic_mute_control = Button(
+            child=Label(style_classes="media-control-icon", markup=Icons.microphone),
+            on_clicked=lambda *_: self.media_service.toggle_mic_mute(),
+        )
+        add_hover_cursor(self.mic_mute_control)
+
         self.children = [
+            self.art,
             self.media_info,
             self.output_control,
             self.prev_track_control,
             self.play_control,
             self.next_track_control,
             self.mute_control,
+            self.mic_mute_control,
         ]
 
         bulk_connect(
             self.media_service,
             {
-                "notify::speaker": self.on_notify_speaker,
+                "notify::default-sink": self.on_notify_default_sink,
+                "notify::default-source": self.on_notify_default_source,
+                "notify::mic-is-muted": self.on_notify_mic_is_muted,
                 "playback-status": self.on_playback_status,
                 "metadata": self.on_metadata,
+                "position-synced": lambda *_: self.progress.update(),
                 "notify::is-muted": self.on_notify_is_muted,
             },
         )
 
+        self.on_notify_default_sink()
+        self.on_notify_default_source()
+        self.on_notify_mic_is_muted()
+        self.on_metadata(self.media_service, self.media_service.track, TRACK_FIELDS)
+
     def on_playback_status(self, service, status: Playerctl.PlaybackStatus):
         if status == Playerctl.PlaybackStatus.PLAYING:
             label = Label(style_classes="media-control-icon", markup=Icons.pause)
@@ -105,61 +139,46 @@ class MediaControl(Box):
 
         self.play_control.children = label
 
-    def on_metadata(self, service, metadata: GLib.Variant):
-        """
-        Update media info on bar and on media panel
-        """
-        self.update_title(metadata)
+    def on_metadata(self, service, track: TrackMetadata, changed: frozenset[str]):
+        if "title" in changed:
+            self.update_title(track)
 
-        self.update_artist(metadata)
+        if "artists" in changed:
+            self.update_artist(track)
 
-        self.update_media_info_visibility(metadata)
+        self.media_info.set_visible(track.title != "" or len(track.artists) != 0)
 
-    def update_title(self, metadata: dict):
-        if "xesam:title" in metadata.keys() and metadata["xesam:title"] != "":
-            self.media_info.set_property("visible", True)
+        if "art_url" in changed:
+            self.update_art(track)
 
-            title = truncate(metadata["xesam:title"], 36)
-            self.title.set_property("label", title)
-            self.title.set_property("visible", True)
-        else:
-            self.title.set_property("visible", False)
+    def update_title(self, track: TrackMetadata):
+        self.title.set_label(truncate(track.title, 36))
+        self.title.set_visible(track.title != "")
 
-    def update_artist(self, metadata: dict):
-        if "xesam:artist" in metadata.keys() and metadata["xesam:artist"] != [""]:
-            self.media_info.set_property("visible", True)
+    def update_artist(self, track: TrackMetadata):
+        artist = track.artists[0] if len(track.artists) != 0 else ""
+        self.artist.set_label(truncate(artist, 36))
+        self.artist.set_visible(artist != "")
 
-            artist = truncate(metadata["xesam:artist"][0], 36)
-            self.artist.set_property("label", artist)
-            self.artist.set_property("visible", True)
-        else:
-            self.artist.set_property("visible", False)
-
-    def update_media_info_visibility(self, metadata: dict):
-        if (
-            "xesam:title" in metadata.keys()
-            and metadata["xesam:title"] == ""
-            and "xesam:artist" in metadata.keys()
-            and metadata["xesam:artist"] == [""]
-        ):
-            self.media_info.set_property("visible", False)
-
-    def update_art(self, metadata: dict):
-        if "mpris:artUrl" in metadata.keys():
-            file_path = get_file_path_from_mpris_url(metadata["mpris:artUrl"])
-            self_width = self.get_preferred_width().natural_width
-            art_pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                file_path, self_width - 60, self_width - 60, True
-            )
-            self.media_panel.art.set_property("pixbuf", art_pixbuf)
-            visible = True
-        else:
-            visible = False
+    def update_art(self, track: TrackMetadata):
+        self.art_url = track.art_url
+        if track.art_url == "":
+            self.art.set_visible(False)
+            return
 
-        self.media_panel.art.set_visible(visible)
+        self.art_loader.load(track.art_url, ART_SIZE, self.on_art_loaded)
 
-    def on_notify_speaker(self, *args):
-        if self.media_service.speaker.name in HEADPHONES:
+    def on_art_loaded(self, art_url: str, pixbuf: GdkPixbuf.Pixbuf | None):
+        if art_url != self.art_url:
+            return
+
+        if pixbuf is not None:
+            self.art.set_from_pixbuf(pixbuf)
+        self.art.set_visible(pixbuf is not None)
+
+    def on_notify_default_sink(self, *args):
+        sink = self.media_service.default_sink
+        if sink is not None and sink.name in HEADPHONES:
             icon = Icons.headphones
         else:
             icon = Icons.speaker
@@ -167,6 +186,45 @@ class MediaControl(Box):
         label = Label(style_classes="media-control-icon", markup=icon)
 
         self.output_control.children = label
+        self.output_control.set_tooltip_text(
+            sink.description if sink is not None else ""
+        )
+
+    def on_output_control_button_press(self, button, event):
+        if event.button != 3:
+            return False
+
+        menu = Gtk.Menu(name="sink-picker")
+        default_sink = self.media_service.default_sink
+        for sink in self.media_service.sinks:
+            item = Gtk.CheckMenuItem(
+                label=sink.description,
+                active=default_sink is not None and sink.name == default_sink.name,
+            )
+            item.connect(
+                "activate",
+                lambda _, name=sink.name: self.media_service.set_default_sink(name),
+            )
+            menu.append(item)
+
+        menu.show_all()
+        menu.popup_at_pointer(event)
+        # keep the menu alive while it is shown
+        self.sink_picker = menu
+        return True
+
+    def on_notify_default_source(self, *args):
+        self.mic_mute_control.set_visible(self.media_service.default_source is not None)
+
+    def on_notify_mic_is_muted(self, *args):
+        if self.media_service.mic_is_muted:
+            icon = Icons.microphone_off
+        else:
+            icon = Icons.microphone
+
+        self.mic_mute_control.children = Label(
+            markup=icon, style_classes="media-control-icon"
+        )
 
     def on_notify_is_muted(self, *args):
         if self.media_service.is_muted:
@@ -177,9 +235,3 @@ class MediaControl(Box):
         mute_label = Label(markup=icon, style_classes="media-control-icon")
 
         self.mute_control.children = mute_label
-
-    def show_media_info_panel(self, *args):
-        toggle_visible(self.media_panel)
-
-    def hide_media_info_panel(self, *args):
-        toggle_visible(self.media_panel)
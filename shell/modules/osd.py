@@ -4,8 +4,10 @@ from fabric.widgets.label import Label
 
 from widgets.animated_scale import AnimatedScale
 from services.media import MediaService
+from util.audio import AudioDevice
 import config.icons as Icons
 from config.osd import TIMEOUT_DELAY
+from config.media import HEADPHONES
 
 from gi.repository import GLib
 
@@ -33,18 +35,26 @@ class VolumeOSD(Window):
         self.volume_label = Label(
             markup=Icons.volume_high, style_classes="volume-osd-label"
         )
+        # names the device a change applies to
+        self.device_label = Label(style_classes="volume-osd-device-label")
 
         self.content = Box(
             orientation="v",
             children=[
                 self.volume_scale,
                 self.volume_label,
+                self.device_label,
             ],
         )
 
         self.add(self.content)
 
+        default_sink = self.media_service.default_sink
+        self.default_sink_name = default_sink.name if default_sink else None
+
         self.media_service.connect("notify::volume", self.on_notify_volume)
+        self.media_service.connect("notify::default-sink", self.on_notify_default_sink)
+        self.media_service.connect("notify::mic-is-muted", self.on_notify_mic_is_muted)
 
         # do allow user to move scale value with clicking
         self.volume_scale.set_sensitive(False)
@@ -56,13 +66,41 @@ class VolumeOSD(Window):
         return False
 
     def on_notify_volume(self, *args):
+        sink = self.media_service.default_sink
+        if sink is not None and sink.name in HEADPHONES:
+            icon = Icons.headphones
+        elif self.media_service.is_muted:
+            icon = Icons.volume_muted
+        else:
+            icon = Icons.volume_high
+
+        self.show_device(sink, self.media_service.volume, icon)
+
+    def on_notify_default_sink(self, *args):
+        sink = self.media_service.default_sink
+        sink_name = sink.name if sink is not None else None
+
+        # volume changes of the same sink are shown through notify::volume
+        if sink_name != self.default_sink_name:
+            self.default_sink_name = sink_name
+            self.on_notify_volume()
+
+    def on_notify_mic_is_muted(self, *args):
+        source = self.media_service.default_source
+        if self.media_service.mic_is_muted:
+            self.show_device(source, 0.0, Icons.microphone_off)
+        else:
+            volume = source.volume if source is not None else 0.0
+            self.show_device(source, volume, Icons.microphone)
+
+    def show_device(self, device: AudioDevice | None, volume: float, icon: str):
         if self.timeout_id is not None:
             GLib.source_remove(self.timeout_id)
             self.timeout_id = None
 
-        volume = self.media_service.volume
-
         self.volume_scale.animate_value(volume)
+        self.volume_label.set_markup(icon)
+        self.device_label.set_label(device.description if device is not None else "")
 
         self.show()
 
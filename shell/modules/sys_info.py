@@ -1,21 +1,20 @@
 from fabric.widgets.label import Label
 from fabric.widgets.box import Box
 from fabric.widgets.circularprogressbar import CircularProgressBar
-from fabric import Fabricator
 
 from services.network import NetworkService
 from services.notifications import NotificationService
+from services.system_metrics import SystemMetricsService
+from config.sys_info import METRIC_HISTORY_WINDOWS
 import config.icons as Icons
 from widgets.animated_circular_progress_bar import AnimatedCircularProgressBar
+from widgets.sparkline import Sparkline
 
-import psutil
-from pynvml_utils import nvidia_smi
-
-nvsmi = nvidia_smi.getInstance()
+import time
 
 
 class SysInfoCircularBar(AnimatedCircularProgressBar):
-    def __init__(self, icon, poll_func, **kwargs):
+    def __init__(self, icon, metric: str, **kwargs):
         super().__init__(
             h_align="center",
             v_align="center",
@@ -29,13 +28,51 @@ class SysInfoCircularBar(AnimatedCircularProgressBar):
 
         self.children = Label(markup=icon, style_classes="sys-info-icon")
 
-        self.value_fabricator = Fabricator(
-            interval=500, poll_from=poll_func, on_changed=self.on_value_changed
+        self.metric = metric
+        self.metrics_service = SystemMetricsService.get_instance()
+        self.metrics_service.connect(f"notify::{metric}", self.on_notify_metric)
+        self.metrics_service.poll_task.watch(self)
+        self.on_notify_metric()
+
+        # recent history is only read when the tooltip is shown
+        self.tooltip_label = Label(style_classes="sys-info-tooltip-label")
+        self.sparkline = Sparkline(style_classes="sys-info-sparkline")
+        self.tooltip_box = Box(
+            style_classes="sys-info-tooltip",
+            orientation="v",
+            spacing=10,
+            children=[self.tooltip_label, self.sparkline],
         )
+        self.tooltip_box.show_all()
+
+        self.set_has_tooltip(True)
+        self.connect("query-tooltip", self.on_query_tooltip)
 
-    def on_value_changed(self, _, value):
+    def on_notify_metric(self, *args):
+        value = self.metrics_service.get_property(self.metric)
         self.animate_value(value / 100.0)
 
+    def on_query_tooltip(self, widget, x, y, keyboard_mode, tooltip):
+        history = self.metrics_service.get_history(self.metric)
+        now = time.monotonic()
+
+        lines = []
+        for window in METRIC_HISTORY_WINDOWS:
+            stats = history.stats(window, now)
+            if stats is not None:
+                lines.append(
+                    f"{window // 60:>2}m  min {stats.minimum:3.0f}%  "
+                    + f"avg {stats.average:3.0f}%  max {stats.maximum:3.0f}%"
+                )
+        self.tooltip_label.set_label("\n".join(lines))
+
+        longest_window = max(METRIC_HISTORY_WINDOWS)
+        times, values = history.samples(longest_window, now)
+        self.sparkline.set_samples(times, values, now - longest_window, now)
+
+        tooltip.set_custom(self.tooltip_box)
+        return True
+
 
 class CPUUsage(Box):
     def __init__(self, **kwargs):
@@ -46,7 +83,7 @@ class CPUUsage(Box):
             children=SysInfoCircularBar(
                 style_classes="sys-info-circular-bar",
                 icon=Icons.cpu,
-                poll_func=lambda *_: psutil.cpu_percent(),
+                metric="cpu-usage",
             ),
             **kwargs,
         )
@@ -61,14 +98,11 @@ class GPUUsage(Box):
             children=SysInfoCircularBar(
                 style_classes="sys-info-circular-bar",
                 icon=Icons.gpu,
-                poll_func=self._get_usage,
+                metric="gpu-usage",
             ),
             **kwargs,
         )
 
-    def _get_usage(self, *_):
-        return nvsmi.DeviceQuery("utilization.gpu")["gpu"][0]["utilization"]["gpu_util"]
-
 
 class RAM(Box):
     def __init__(self, **kwargs):
@@ -79,7 +113,7 @@ class RAM(Box):
             children=SysInfoCircularBar(
                 style_classes="sys-info-circular-bar",
                 icon=Icons.ram,
-                poll_func=lambda *_: psutil.virtual_memory().percent,
+                metric="ram-usage",
             ),
             **kwargs,
         )
@@ -94,7 +128,7 @@ class Disk(Box):
             children=SysInfoCircularBar(
                 style_classes="sys-info-circular-bar",
                 icon=Icons.disk,
-                poll_func=lambda *_: psutil.disk_usage("/").percent,
+                metric="disk-usage",
             ),
             **kwargs,
         )
@@ -4,12 +4,16 @@ from fabric.widgets.image import Image
 from fabric.widgets.eventbox import EventBox
 from fabric.widgets.button import Button
 from fabric.widgets.label import Label
+from fabric.utils import bulk_connect
 
 from util.ui import add_hover_cursor
-from util.helpers import get_pixbuff
+from util.thumbnails import ThumbnailCache
 from services.theme import ThemeService
+from config.theme import THUMBNAIL_HEIGHT, THUMBNAIL_WIDTH
 import config.icons as Icons
 
+from gi.repository import GdkPixbuf, GLib
+
 from pathlib import Path
 
 
@@ -55,15 +59,22 @@ class ThemeSettings(Box):
 
 
 class WallpaperViewer(ScrolledWindow):
+    """
+    Gallery of wallpapers. Rows reserve the size of a thumbnail and only
+    load it once they are scrolled near the view. Wallpapers that are
+    added, removed or changed only patch their own row.
+    """
+
     def __init__(self, **kwargs):
         self.service = ThemeService.get_instance()
+        self.thumbnail_cache = ThumbnailCache.get_instance()
 
+        self.rows: dict[Path, Wallpaper] = {}
         self.wallpapers = Box(
             spacing=20,
             orientation="v",
             v_expand=True,
         )
-        self.load_wallpapers()
 
         super().__init__(
             name="wallpaper-viewer",
@@ -73,28 +84,105 @@ class WallpaperViewer(ScrolledWindow):
             **kwargs,
         )
 
-        self.service.connect("notify::wallpapers", self.load_wallpapers)
+        self.load_wallpapers()
 
-    def load_wallpapers(self, *args):
-        self.wallpapers.children = [
-            Wallpaper(path, self.service) for path in self.service.wallpapers
-        ]
+        vadjustment = self.get_vadjustment()
+        vadjustment.connect("value-changed", lambda *_: self.load_visible_thumbnails())
+        # the page size is known once shown, and rows move as thumbnails arrive
+        vadjustment.connect("changed", lambda *_: self.load_visible_thumbnails())
+        bulk_connect(
+            self.service,
+            {
+                "wallpaper-added": self.on_wallpaper_added,
+                "wallpaper-removed": self.on_wallpaper_removed,
+                "wallpaper-changed": self.on_wallpaper_changed,
+            },
+        )
+
+    def load_wallpapers(self):
+        self.rows = {
+            path: Wallpaper(path, self.service) for path in self.service.wallpapers
+        }
+        self.wallpapers.children = list(self.rows.values())
+
+        # rows are allocated before thumbnails are loaded for them
+        GLib.idle_add(self.load_visible_thumbnails)
+
+    def on_wallpaper_added(self, service, path: Path):
+        row = Wallpaper(path, self.service)
+        self.rows[path] = row
+        self.wallpapers.add(row)
+        self.wallpapers.reorder_child(row, self.service.wallpapers.index(path))
+        row.show_all()
+
+        GLib.idle_add(self.load_visible_thumbnails)
+
+    def on_wallpaper_removed(self, service, path: Path):
+        row = self.rows.pop(path, None)
+        if row is not None:
+            row.destroy()
+
+    def on_wallpaper_changed(self, service, path: Path):
+        row = self.rows.get(path)
+        if row is not None:
+            row.reset_thumbnail()
+            GLib.idle_add(self.load_visible_thumbnails)
+
+    def load_visible_thumbnails(self) -> bool:
+        vadjustment = self.get_vadjustment()
+        page_size = vadjustment.get_page_size()
+        # rows a page above and below the view load ahead of scrolling
+        top = vadjustment.get_value() - page_size
+        bottom = vadjustment.get_value() + 2 * page_size
+
+        for row in self.rows.values():
+            if row.thumbnail_requested:
+                continue
+
+            allocation = row.get_allocation()
+            if allocation.height <= 1:
+                # not allocated yet
+                continue
+            if allocation.y + allocation.height >= top and allocation.y <= bottom:
+                row.load_thumbnail(self.thumbnail_cache)
+
+        return False
 
 
 class Wallpaper(EventBox):
     def __init__(self, wallpaper: Path, service: ThemeService, **kwargs):
+        self.image = Image()
+        self.image.set_size_request(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)
+
         super().__init__(
             events="button-press",
-            child=Image(pixbuf=get_pixbuff(str(wallpaper), 600, 520)),
+            child=self.image,
             **kwargs,
         )
 
         self.service = service
         self.wallpaper = wallpaper
+        self.thumbnail_requested = False
 
         self.connect("button-press-event", self.on_button_press)
         add_hover_cursor(self)
 
+    def load_thumbnail(self, thumbnail_cache: ThumbnailCache) -> None:
+        self.thumbnail_requested = True
+        thumbnail_cache.load(
+            self.wallpaper, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT, self.on_thumbnail_loaded
+        )
+
+    def reset_thumbnail(self) -> None:
+        """Makes the row load a new thumbnail once it is in view."""
+        self.thumbnail_requested = False
+
+    def on_thumbnail_loaded(self, path: Path, pixbuf: GdkPixbuf.Pixbuf | None):
+        if pixbuf is not None:
+            self.image.set_from_pixbuf(pixbuf)
+            # the thumbnail keeps its aspect ratio, the row shrinks to fit it
+            self.image.set_size_request(-1, -1)
+
     def on_button_press(self, widget, event):
         button = event.get_button()[1]
 
@@ -1,9 +1,9 @@
 from typing import List
 from fabric.core.service import Service, Property
-from fabric.utils.helpers import invoke_repeater
 
 from util.helpers import get_country_code
 from util.singleton import Singleton
+from services.poll_scheduler import PollScheduler
 from config.calendar import USER_BIRTHDAY, FIRST_WEEK_DAY, TODAY_UPDATE_INTERVAL
 
 from datetime import date as Date
@@ -26,7 +26,8 @@ class CalendarService(Service, Singleton):
         self._holidays = holidays.country_holidays(self._country_code)
         self._user_birthday = Date.fromisoformat(USER_BIRTHDAY)
 
-        invoke_repeater(TODAY_UPDATE_INTERVAL, self.update_today)
+        # never backs off, the date changes on a schedule of its own
+        PollScheduler.get_instance().add(self.update_today, TODAY_UPDATE_INTERVAL)
 
     @Property(Date, flags="readable")
     def today(self) -> Date:
@@ -100,9 +101,11 @@ class CalendarService(Service, Singleton):
     def update_today(self) -> bool:
         today = Date.today()
 
-        if today != self.today:
-            self._today = today
-            self.notify("today")
+        if today == self.today:
+            return False
+
+        self._today = today
+        self.notify("today")
 
         return True
 
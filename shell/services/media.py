@@ -1,19 +1,24 @@
 from fabric.core import Service, Signal, Property
-from fabric.audio import Audio as AudioService, AudioStream
-from fabric.utils import invoke_repeater, bulk_connect
+from fabric.utils import bulk_connect
 
 from util.singleton import Singleton
-from config.media import VOLUME_AND_MUTED_UPDATE_INTERVAL, UNSUPPORTED_PLAYER_NAMES
+from config.media import METADATA_COALESCE_MS, UNSUPPORTED_PLAYER_NAMES
 from services.bluetooth import BluetoothService
+from services.pulse_listener import PulseListener
+from util.audio import (
+    AudioDevice,
+    AudioState,
+    get_device_identity,
+    read_audio_state,
+)
+from util.playback_clock import PlaybackClock
+from util.track import EMPTY_TRACK, TrackMetadata
 
 import pulsectl
 from gi.repository import Playerctl, GLib
 from loguru import logger
 
 
-# TODO: add microphone support
-
-
 MICROSECONDS_PER_SECOND = 1e6
 
 
@@ -38,9 +43,29 @@ class MediaService(Service, Singleton):
     def is_muted(self, new_muted: bool):
         self._is_muted = new_muted
 
-    @Property(AudioStream, flags="readable")
-    def speaker(self) -> AudioStream:
-        return self.audio_service.speaker
+    @Property(bool, default_value=False, flags="read-write")
+    def mic_is_muted(self) -> bool:
+        return self._mic_is_muted
+
+    @mic_is_muted.setter
+    def mic_is_muted(self, new_muted: bool):
+        self._mic_is_muted = new_muted
+
+    @Property(object, flags="readable")
+    def default_sink(self) -> AudioDevice | None:
+        return self._audio_state.default_sink
+
+    @Property(object, flags="readable")
+    def default_source(self) -> AudioDevice | None:
+        return self._audio_state.default_source
+
+    @Property(list, flags="readable")
+    def sinks(self) -> list[AudioDevice]:
+        return list(self._audio_state.sinks.values())
+
+    @Property(object, flags="readable")
+    def track(self) -> TrackMetadata:
+        return self._track
 
     @Property(Playerctl.Player | None, flags="read-write")
     def player(self) -> Playerctl.Player | None:
@@ -53,33 +78,50 @@ class MediaService(Service, Singleton):
     @Signal("playback-status", arg_types=Playerctl.PlaybackStatus)
     def playback_status(self, status: Playerctl.PlaybackStatus) -> None: ...
 
-    @Signal("metadata", arg_types=GLib.Variant)
-    def metadata(self, metadata: GLib.Variant) -> None: ...
+    @Signal("position-synced")
+    def position_synced(self) -> None:
+        """Emitted after the clock was anchored to the player's position."""
+
+    @Signal("metadata", arg_types=(object, object))
+    def metadata(self, track: TrackMetadata, changed: frozenset[str]) -> None:
+        """Emitted with the names of the track fields that changed."""
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        self._position_repeater_id = None
+        # interpolates the position of the top player between its events
+        self.clock = PlaybackClock()
+
+        self._track = EMPTY_TRACK
+        # players send metadata in bursts, only the last of a burst is applied
+        self._pending_metadata = None
+        self._metadata_source_id = None
 
+        # only used for commands, state comes from the pulse listener
         self.pulse = pulsectl.Pulse()
-        self.audio_service = AudioService()
         self.player_manager = Playerctl.PlayerManager()
         self.bluetooth_service = BluetoothService.get_instance()
 
-        self.volume = self.get_pulse_volume()
-        self.is_muted = self.get_pulse_is_muted()
-
-        invoke_repeater(
-            VOLUME_AND_MUTED_UPDATE_INTERVAL,
-            self.update_volume_and_is_muted,
+        self._volume = 0.0
+        self._is_muted = False
+        self._mic_is_muted = False
+        self._audio_state = AudioState()
+        self.update_audio_state(read_audio_state(self.pulse))
+
+        # sinks and sources follow pulse events instead of being polled, so
+        # reading them never needs a request
+        self.pulse_listener = PulseListener(
+            self.read_audio_state,
+            self.update_audio_state,
+            event_masks=("sink", "source", "server"),
         )
-
-        self.audio_service.connect("speaker-changed", self.on_speaker_changed)
+        self.pulse_listener.start()
 
         for player_name in self.player_manager.props.player_names:
             self.init_player(player_name)
 
         self.player = self.get_top_player()
+        self.sync_position()
 
         self.player_manager.connect("name-appeared", self.on_name_appeared)
 
@@ -92,31 +134,42 @@ class MediaService(Service, Singleton):
             },
         )
 
-    def get_pulse_volume(self) -> float:
-        sink = self.pulse.sink_default_get()
-        volume = sink.volume.value_flat
-        return volume
+    @staticmethod
+    def read_audio_state(pulse: pulsectl.Pulse) -> AudioState:
+        """Runs on the pulse listener thread with the listener's client."""
+        return read_audio_state(pulse)
 
-    def get_pulse_is_muted(self) -> bool:
-        sink = self.pulse.sink_default_get()
-        is_muted = sink.mute
-        return bool(is_muted)
+    def update_audio_state(self, state: AudioState) -> None:
+        previous_state = self._audio_state
+        self._audio_state = state
 
-    def update_volume_and_is_muted(self):
-        volume = self.get_pulse_volume()
-        is_muted = self.get_pulse_is_muted()
-        if is_muted:
-            volume = 0.0
+        sink = state.default_sink
+        is_muted = sink is not None and sink.is_muted
+        volume = sink.volume if sink is not None and not is_muted else 0.0
 
         if volume != self.volume:
             self.volume = volume
         if is_muted != self.is_muted:
             self.is_muted = is_muted
 
-        return True
-
-    def on_speaker_changed(self, *args):
-        self.notify("speaker")
+        source = state.default_source
+        mic_is_muted = source is not None and source.is_muted
+        if mic_is_muted != self.mic_is_muted:
+            self.mic_is_muted = mic_is_muted
+
+        # volume and mute changes are notified through their own properties
+        if list(map(get_device_identity, state.sinks.values())) != list(
+            map(get_device_identity, previous_state.sinks.values())
+        ):
+            self.notify("sinks")
+        if get_device_identity(sink) != get_device_identity(
+            previous_state.default_sink
+        ):
+            self.notify("default-sink")
+        if get_device_identity(source) != get_device_identity(
+            previous_state.default_source
+        ):
+            self.notify("default-source")
 
     def init_player(self, player_name):
         if player_name.name in UNSUPPORTED_PLAYER_NAMES:
@@ -125,43 +178,101 @@ class MediaService(Service, Singleton):
         player = Playerctl.Player.new_from_name(player_name)
         player.connect("playback-status", self.on_playback_status, self.player_manager)
         player.connect("metadata", self.on_metadata, self.player_manager)
+        player.connect("seeked", self.on_seeked, self.player_manager)
         self.player_manager.manage_player(player)
 
     def on_playback_status(self, player, status, manager):
         self.playback_status(status)
-        if status == Playerctl.PlaybackStatus.PLAYING and self.player is not None:
-            # make sure the current track's metadata is dispersed
-            self.metadata(self.player.props.metadata)
+        if player == self.player:
+            self.sync_position()
+        if status == Playerctl.PlaybackStatus.PLAYING:
+            # a player that starts playing shows its track, applying a track
+            # that is already shown emits nothing
+            self.queue_metadata(player.props.metadata)
 
     def on_metadata(self, player, metadata, manager):
         if metadata is not None:
-            self.metadata(metadata)
-            # make sure that bluetooth device is shown in control panel
-            self.bluetooth_service.notifier("connected-devices")
+            self.queue_metadata(metadata)
+
+    def on_seeked(self, player, position, manager):
+        if player == self.player:
+            self.sync_position()
+
+    def sync_position(self) -> None:
+        """Anchors the clock to the top player, the only position request made."""
+        player = self.player
+        if player is None:
+            self.clock.reset()
+        else:
+            try:
+                position = player.get_position()
+            except GLib.Error:
+                position = 0
+
+            self.clock.sync(
+                position,
+                player.props.playback_status == Playerctl.PlaybackStatus.PLAYING,
+                TrackMetadata.from_variant(player.props.metadata).length,
+            )
+
+        self.position_synced()
+
+    def queue_metadata(self, metadata: GLib.Variant | None) -> None:
+        self._pending_metadata = metadata
+        if self._metadata_source_id is None:
+            self._metadata_source_id = GLib.timeout_add(
+                METADATA_COALESCE_MS, self._apply_metadata
+            )
+
+    def _apply_metadata(self) -> bool:
+        self._metadata_source_id = None
+        track = TrackMetadata.from_variant(self._pending_metadata)
+        self._pending_metadata = None
+
+        changed = track.changed_fields(self._track)
+        if len(changed) == 0:
+            return False
+
+        self._track = track
+        self.notify("track")
+        if "track_id" in changed or "length" in changed:
+            # a new track starts at its own position
+            self.sync_position()
+        self.metadata(track, changed)
+        # make sure that bluetooth device is shown in control panel
+        self.bluetooth_service.notifier("connected-devices")
+
+        return False
 
     def on_name_appeared(self, manager, player_name):
         self.init_player(player_name)
 
     def on_player(self, manager, player):
         self.player = self.get_top_player()
+        self.sync_position()
 
     def swap_speaker(self):
         """
         Changes audio output by rotating through the sinks
         detected by pulse audio.
         """
-        sink_names = [sink.name for sink in self.pulse.sink_list()]
-        default_sink = self.pulse.sink_default_get()
-        default_sink_idx = sink_names.index(default_sink.name)
+        sink_names = list(self._audio_state.sinks)
+        if len(sink_names) == 0:
+            return
 
-        new_sink_idx = (default_sink_idx + 1) % len(sink_names)
-        new_sink_name = sink_names[new_sink_idx]
+        default_sink_name = self._audio_state.default_sink_name
+        if default_sink_name in sink_names:
+            new_sink_idx = (sink_names.index(default_sink_name) + 1) % len(sink_names)
+        else:
+            new_sink_idx = 0
+
+        self.set_default_sink(sink_names[new_sink_idx])
 
+    def set_default_sink(self, sink_name: str):
         try:
-            new_sink = self.pulse.get_sink_by_name(new_sink_name)
-            self.pulse.sink_default_set(new_sink)
-        except pulsectl.pulsectl.PulseIndexError:
-            logger.error(f"Could not set default sink: {new_sink_name}")
+            self.pulse.sink_default_set(sink_name)
+        except pulsectl.PulseError as e:
+            logger.error(f"Could not set default sink {sink_name}: {e}")
 
     def get_top_player(self) -> Playerctl.Player | None:
         players = self.player_manager.props.players
@@ -198,5 +309,21 @@ class MediaService(Service, Singleton):
             logger.warning(f"Could not skip to next track: {e}")
 
     def toggle_mute(self):
-        sink = self.pulse.sink_default_get()
-        self.pulse.mute(sink, not sink.mute)
+        sink = self.default_sink
+        if sink is None:
+            return
+
+        try:
+            self.pulse.sink_mute(sink.index, not sink.is_muted)
+        except pulsectl.PulseError as e:
+            logger.error(f"Could not toggle mute of {sink.name}: {e}")
+
+    def toggle_mic_mute(self):
+        source = self.default_source
+        if source is None:
+            return
+
+        try:
+            self.pulse.source_mute(source.index, not source.is_muted)
+        except pulsectl.PulseError as e:
+            logger.error(f"Could not toggle mute of {source.name}: {e}")
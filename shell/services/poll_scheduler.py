@@ -0,0 +1,197 @@
+from collections.abc import Callable
+
+from config.polling import POLL_BACKOFF_FACTOR
+from fabric.core.service import Property, Service
+from gi.repository import Gio, GLib
+from loguru import logger
+from util.singleton import Singleton
+
+LOGIND_BUS_NAME = "org.freedesktop.login1"
+LOGIND_MANAGER_PATH = "/org/freedesktop/login1"
+LOGIND_MANAGER_INTERFACE = "org.freedesktop.login1.Manager"
+LOGIND_SESSION_INTERFACE = "org.freedesktop.login1.Session"
+
+
+class PollTask:
+    """
+    A callback polled by the PollScheduler. The callback returns whether the
+    value it polls changed, stable values are polled less and less often.
+    """
+
+    def __init__(
+        self,
+        scheduler: "PollScheduler",
+        callback: Callable[[], bool],
+        interval: int,
+        max_interval: int | None = None,
+    ):
+        self.scheduler = scheduler
+        self.callback = callback
+        self.interval = interval
+        self.max_interval = max_interval if max_interval is not None else interval
+        self.current_interval = interval
+
+        self._source_id = None
+        self._widgets = []
+
+    @property
+    def is_active(self) -> bool:
+        if self.scheduler.is_suspended:
+            return False
+
+        return len(self._widgets) == 0 or any(
+            widget.get_mapped() for widget in self._widgets
+        )
+
+    def watch(self, widget) -> None:
+        """Only polls while at least one of the watched widgets is mapped."""
+        self._widgets.append(widget)
+        widget.connect("map", lambda *_: self.update_state())
+        widget.connect("unmap", lambda *_: self.update_state())
+        widget.connect("destroy", self.on_widget_destroyed)
+
+        self.update_state()
+
+    def on_widget_destroyed(self, widget) -> None:
+        self._widgets.remove(widget)
+        self.update_state()
+
+    def update_state(self) -> None:
+        if self.is_active and self._source_id is None:
+            # the value may have changed any time while the task was paused
+            self.current_interval = self.interval
+            self._poll()
+        elif not self.is_active and self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+
+    def _poll(self) -> None:
+        if self.callback():
+            self.current_interval = self.interval
+        else:
+            self.current_interval = min(
+                self.current_interval * POLL_BACKOFF_FACTOR, self.max_interval
+            )
+
+        # the callback may have unmapped the watched widgets or suspended the
+        # scheduler, update_state polls again once the task is active. A state
+        # change during the callback may also have scheduled the task already.
+        if not self.is_active or self._source_id is not None:
+            return
+
+        # whole seconds are grouped with other second timers by GLib, so
+        # backed off tasks share wakeups
+        if self.current_interval % 1000 == 0:
+            self._source_id = GLib.timeout_add_seconds(
+                self.current_interval // 1000, self.on_timeout
+            )
+        else:
+            self._source_id = GLib.timeout_add(self.current_interval, self.on_timeout)
+
+    def on_timeout(self) -> bool:
+        self._source_id = None
+        self._poll()
+
+        return False
+
+
+class PollScheduler(Service, Singleton):
+    """
+    Central timer for polled values. Every task backs off while its value
+    stays the same and pauses while the widgets showing it are unmapped.
+    All tasks pause while logind reports the session as idle or locked.
+    """
+
+    @Property(bool, default_value=False, flags="read-write")
+    def is_suspended(self) -> bool:
+        return self._is_suspended
+
+    @is_suspended.setter
+    def is_suspended(self, new_suspended: bool):
+        self._is_suspended = new_suspended
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self._is_suspended = False
+        self._tasks: list[PollTask] = []
+
+        self._session = self.get_session_proxy()
+        if self._session is not None:
+            self._session.connect(
+                "g-properties-changed", self.on_session_properties_changed
+            )
+            self.update_suspended()
+
+        self.connect("notify::is-suspended", self.on_notify_is_suspended)
+
+    def add(
+        self,
+        callback: Callable[[], bool],
+        interval: int,
+        max_interval: int | None = None,
+    ) -> PollTask:
+        """
+        Polls callback every interval milliseconds, backing off up to
+        max_interval while it returns False. Without a max interval the
+        task only pauses and never backs off.
+        """
+        task = PollTask(self, callback, interval, max_interval)
+        self._tasks.append(task)
+        task.update_state()
+
+        return task
+
+    def get_session_proxy(self) -> Gio.DBusProxy | None:
+        try:
+            manager = Gio.DBusProxy.new_for_bus_sync(
+                Gio.BusType.SYSTEM,
+                Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES,
+                None,
+                LOGIND_BUS_NAME,
+                LOGIND_MANAGER_PATH,
+                LOGIND_MANAGER_INTERFACE,
+                None,
+            )
+            # signals are sent from the real session path, not from /session/auto
+            (session_path,) = manager.call_sync(
+                "GetSession",
+                GLib.Variant("(s)", ("auto",)),
+                Gio.DBusCallFlags.NONE,
+                -1,
+                None,
+            ).unpack()
+
+            return Gio.DBusProxy.new_for_bus_sync(
+                Gio.BusType.SYSTEM,
+                Gio.DBusProxyFlags.NONE,
+                None,
+                LOGIND_BUS_NAME,
+                session_path,
+                LOGIND_SESSION_INTERFACE,
+                None,
+            )
+        except GLib.Error as e:
+            logger.warning(f"Could not watch logind session, polling never pauses. {e}")
+            return None
+
+    def on_session_properties_changed(self, proxy, changed, invalidated):
+        changed = changed.unpack()
+        if "IdleHint" in changed or "LockedHint" in changed:
+            self.update_suspended()
+
+    def update_suspended(self) -> None:
+        is_suspended = any(
+            self.get_session_hint(name) for name in ("IdleHint", "LockedHint")
+        )
+        if is_suspended != self.is_suspended:
+            self.is_suspended = is_suspended
+
+    def get_session_hint(self, name: str) -> bool:
+        value = self._session.get_cached_property(name)
+
+        return value is not None and value.unpack()
+
+    def on_notify_is_suspended(self, *args):
+        for task in self._tasks:
+            task.update_state()
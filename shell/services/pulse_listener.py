@@ -0,0 +1,92 @@
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import pulsectl
+from gi.repository import GLib
+from loguru import logger
+
+PULSE_CLIENT_NAME = "gem-shell-events"
+# back-off between attempts to reconnect after the server went away
+RECONNECT_DELAY = 1  # seconds
+MAX_RECONNECT_DELAY = 30  # seconds
+
+
+class PulseListener:
+    """
+    Listens for PulseAudio or pipewire-pulse events on a dedicated thread with
+    a client of its own, pulsectl clients are not thread safe. After every
+    burst of events read_state is called with that client, and its result is
+    handed to on_state_changed on the GLib main loop, only if it differs
+    from the last state.
+    """
+
+    def __init__(
+        self,
+        read_state: Callable[[pulsectl.Pulse], Any],
+        on_state_changed: Callable[[Any], None],
+        event_masks: tuple[str, ...] = ("sink", "server"),
+    ):
+        self.read_state = read_state
+        self.on_state_changed = on_state_changed
+        self.event_masks = event_masks
+
+        self._pulse = None
+        self._last_state = None
+        self._is_stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="pulse-listener", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._is_stopped = True
+        if self._pulse is not None:
+            # the only call that is safe from another thread
+            self._pulse.event_listen_stop()
+
+    def _run(self) -> None:
+        delay = RECONNECT_DELAY
+
+        while not self._is_stopped:
+            try:
+                with pulsectl.Pulse(PULSE_CLIENT_NAME) as pulse:
+                    self._pulse = pulse
+                    pulse.event_mask_set(*self.event_masks)
+                    pulse.event_callback_set(self._on_event)
+                    delay = RECONNECT_DELAY
+
+                    self._publish(self.read_state(pulse))
+                    while not self._is_stopped:
+                        # returns once _on_event stops the loop
+                        pulse.event_listen()
+                        self._publish(self.read_state(pulse))
+            except pulsectl.PulseError as e:
+                logger.warning(
+                    f"Lost connection to pulse, reconnecting in {delay}s. {e}"
+                )
+            finally:
+                self._pulse = None
+
+            if not self._is_stopped:
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _on_event(self, event) -> None:
+        # pulse can not be queried from inside the callback, stop listening
+        # so the state is read between events
+        raise pulsectl.PulseLoopStop
+
+    def _publish(self, state) -> None:
+        if state == self._last_state:
+            return
+
+        self._last_state = state
+        GLib.idle_add(self._dispatch, state)
+
+    def _dispatch(self, state) -> bool:
+        self.on_state_changed(state)
+        return False
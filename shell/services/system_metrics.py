@@ -0,0 +1,129 @@
+import time
+
+import psutil
+from config.sys_info import (
+    DISK_USAGE_PATH,
+    METRIC_HISTORY_WINDOWS,
+    METRICS_MAX_UPDATE_INTERVAL,
+    METRICS_UPDATE_INTERVAL,
+)
+from fabric.core.service import Property, Service
+from services.poll_scheduler import PollScheduler
+from util.gpu import get_gpu_backend
+from util.metric_history import MetricHistory
+from util.singleton import Singleton
+
+# metrics whose recent samples are kept for tooltips
+HISTORY_METRICS = ("cpu_usage", "gpu_usage", "ram_usage", "disk_usage")
+
+
+class SystemMetricsService(Service, Singleton):
+    """
+    Samples every system metric in a single tick and publishes them as
+    percentages, besides the GPU temperature in celsius. Subscribe with
+    notify::<metric>, properties only change and notify when a sample
+    differs from the last one. Recent samples of the usage metrics are kept
+    in fixed size histories.
+    """
+
+    @Property(float, flags="read-write")
+    def cpu_usage(self) -> float:
+        return self._cpu_usage
+
+    @cpu_usage.setter
+    def cpu_usage(self, new_usage: float):
+        self._cpu_usage = new_usage
+
+    @Property(float, flags="read-write")
+    def gpu_usage(self) -> float:
+        return self._gpu_usage
+
+    @gpu_usage.setter
+    def gpu_usage(self, new_usage: float):
+        self._gpu_usage = new_usage
+
+    @Property(float, flags="read-write")
+    def gpu_memory_usage(self) -> float:
+        return self._gpu_memory_usage
+
+    @gpu_memory_usage.setter
+    def gpu_memory_usage(self, new_usage: float):
+        self._gpu_memory_usage = new_usage
+
+    @Property(float, flags="read-write")
+    def gpu_temperature(self) -> float:
+        return self._gpu_temperature
+
+    @gpu_temperature.setter
+    def gpu_temperature(self, new_temperature: float):
+        self._gpu_temperature = new_temperature
+
+    @Property(float, flags="read-write")
+    def ram_usage(self) -> float:
+        return self._ram_usage
+
+    @ram_usage.setter
+    def ram_usage(self, new_usage: float):
+        self._ram_usage = new_usage
+
+    @Property(float, flags="read-write")
+    def disk_usage(self) -> float:
+        return self._disk_usage
+
+    @disk_usage.setter
+    def disk_usage(self, new_usage: float):
+        self._disk_usage = new_usage
+
+    def __init__(self, gpu_backend=None, **kwargs):
+        super().__init__(**kwargs)
+
+        self._cpu_usage = 0.0
+        self._gpu_usage = 0.0
+        self._gpu_memory_usage = 0.0
+        self._gpu_temperature = 0.0
+        self._ram_usage = 0.0
+        self._disk_usage = 0.0
+
+        self._gpu_backend = (
+            gpu_backend if gpu_backend is not None else get_gpu_backend()
+        )
+
+        # enough room for the longest window at the fastest sampling rate
+        capacity = max(METRIC_HISTORY_WINDOWS) * 1000 // METRICS_UPDATE_INTERVAL
+        self._histories = {name: MetricHistory(capacity) for name in HISTORY_METRICS}
+
+        # widgets showing metrics register with poll_task.watch, sampling
+        # pauses while none of them are mapped
+        self.poll_task = PollScheduler.get_instance().add(
+            self.update, METRICS_UPDATE_INTERVAL, METRICS_MAX_UPDATE_INTERVAL
+        )
+
+    def update(self) -> bool:
+        """Samples every metric, returns whether any of them changed."""
+        gpu_sample = self._gpu_backend.sample()
+
+        changed = [
+            self.set_metric("cpu_usage", psutil.cpu_percent()),
+            self.set_metric("gpu_usage", gpu_sample.utilization),
+            self.set_metric("gpu_memory_usage", gpu_sample.memory_usage),
+            self.set_metric("gpu_temperature", gpu_sample.temperature),
+            self.set_metric("ram_usage", psutil.virtual_memory().percent),
+            self.set_metric("disk_usage", psutil.disk_usage(DISK_USAGE_PATH).percent),
+        ]
+
+        now = time.monotonic()
+        for name in HISTORY_METRICS:
+            self._histories[name].append(now, getattr(self, name))
+
+        return any(changed)
+
+    def get_history(self, metric: str) -> MetricHistory:
+        return self._histories[metric.replace("-", "_")]
+
+    def set_metric(self, name: str, value: float) -> bool:
+        value = float(value)
+        if getattr(self, name) == value:
+            return False
+
+        setattr(self, name, value)
+        return True
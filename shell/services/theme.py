@@ -1,48 +1,99 @@
 from fabric.core.service import Service, Property, Signal
-from fabric.utils.helpers import exec_shell_command_async, invoke_repeater, exec_shell_command
+from fabric.utils.helpers import exec_shell_command_async, exec_shell_command
 
 from config.theme import DEFAULT_COLOR_THEME, DEFAULT_CONTRAST, DEFAULT_VARIANT
 from util.singleton import Singleton
+from util.directory_watcher import DirectoryWatcher
+from util.palette_cache import PaletteCache
 from util.theme import (
     ThemeColors,
+    build_theme_colors,
+    hash_file,
+    render_color_styles,
 )
 
-from material_color_utilities import Theme, theme_from_image, Variant
-from config.theme import COLOR_STYLESHEET, CURRENT_WALLPAPER_PATH, WALLPAPERS_DIR
-import re
-from PIL import Image
+from material_color_utilities import Variant
+from config.theme import (
+    CURRENT_WALLPAPER_PATH,
+    THEME_COLORS_PATH,
+    THEME_IMAGE_SIZE,
+    WALLPAPER_SUFFIXES,
+    WALLPAPERS_DIR,
+)
+from concurrent.futures import Future, ThreadPoolExecutor
+from gi.repository import Gdk, Gio, GLib, Gtk
+import bisect
+import os
+import sys
 from pathlib import Path
 from loguru import logger
-import asyncio
 
-REFRESH_WALLPAPERS_TIMEOUT = 60000
+# theme extraction runs as "python -m util.theme_worker" from here
+SHELL_DIRECTORY = Path(__file__).resolve().parent.parent
+
+def is_wallpaper(path: Path) -> bool:
+    """Images in the wallpaper directory, without the current wallpaper link."""
+    return (
+        path.suffix.lower() in WALLPAPER_SUFFIXES
+        and path != CURRENT_WALLPAPER_PATH
+        and path.is_file()
+    )
 
 
 class ThemeService(Service, Singleton):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        self._loop = asyncio.get_event_loop()
+        # quantizing a wallpaper takes seconds, it runs in a worker process
+        # so the bar keeps drawing. The worker is a small module of its own,
+        # a multiprocessing child would import this shell's entry point.
+        self._extraction: Gio.Subprocess | None = None
+        self._extraction_cancellable: Gio.Cancellable | None = None
+        # hashing a wallpaper is mostly reading it, a thread is enough
+        self._hash_executor = ThreadPoolExecutor(max_workers=1)
+        self._palette_cache = PaletteCache()
+        # (path, mtime, size) -> content hash, so unchanged files are hashed once
+        self._content_hashes: dict[tuple, str] = {}
+        # only the result of the latest request is applied
+        self._theme_generation = 0
+
+        # layered above the static stylesheets, which only hold defaults
+        self._color_provider = Gtk.CssProvider()
+        Gtk.StyleContext.add_provider_for_screen(
+            Gdk.Screen.get_default(),
+            self._color_provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_USER + 1,
+        )
 
         self._wallpaper = CURRENT_WALLPAPER_PATH
         self._colors = DEFAULT_COLOR_THEME
         self._variant = DEFAULT_VARIANT
         self._contrast = DEFAULT_CONTRAST
         self._dark = True
+        # sorted by path
         self._wallpapers = []
 
+        self._wallpaper_watcher = DirectoryWatcher(self._sync_wallpaper)
+
         self.load_wallpapers()
+        self._wallpaper_watcher.watch(WALLPAPERS_DIR)
         self.update_theme()
 
         self.connect("theme-changed", self.update_theme)
 
-        invoke_repeater(
-            REFRESH_WALLPAPERS_TIMEOUT, self.load_wallpapers, initial_call=False
-        )
-
     @Signal
     def theme_changed(self) -> None: ...
 
+    @Signal("wallpaper-added", arg_types=(object,))
+    def wallpaper_added(self, path: Path) -> None: ...
+
+    @Signal("wallpaper-removed", arg_types=(object,))
+    def wallpaper_removed(self, path: Path) -> None: ...
+
+    @Signal("wallpaper-changed", arg_types=(object,))
+    def wallpaper_changed(self, path: Path) -> None:
+        """Emitted when the image of a listed wallpaper was rewritten."""
+
     @Property(ThemeColors, flags="read-write")
     def colors(self) -> ThemeColors:
         return self._colors
@@ -93,82 +144,152 @@ class ThemeService(Service, Singleton):
         self.notify("wallpapers")
 
     def update_theme(self, *args):
-        async def _update():
-            self._colors = self.create_colortheme_from_image(
-                self._wallpaper.resolve(), self.contrast, self.variant, self.dark
+        self._theme_generation += 1
+        self.cancel_extraction()
+
+        generation = self._theme_generation
+        path = self._wallpaper.resolve()
+
+        try:
+            stat = path.stat()
+        except OSError as e:
+            logger.error(f"Could not read wallpaper {path}: {e}")
+            return
+
+        file_key = (path, stat.st_mtime_ns, stat.st_size)
+        content_hash = self._content_hashes.get(file_key)
+        if content_hash is not None:
+            self.apply_palette(generation, path, content_hash)
+            return
+
+        future = self._hash_executor.submit(hash_file, str(path))
+        future.add_done_callback(
+            lambda future: GLib.idle_add(
+                self._on_wallpaper_hashed, generation, file_key, future
             )
-            self.update_color_styles()
-
-        self._loop.create_task(_update())
-
-    def create_colortheme_from_image(
-        self, image_path: str, contrast: float, variant: Variant, use_dark: bool
-    ) -> Theme:
-        image = Image.open(image_path)
-        theme = theme_from_image(image, contrast=contrast, variant=variant)
-
-        if use_dark:
-            mat_colors = theme.schemes.dark
-        else:
-            mat_colors = theme.schemes.light
-
-        return ThemeColors(
-            mat_colors.primary,
-            mat_colors.on_surface,
-            mat_colors.background,
-            mat_colors.surface_container,
-            mat_colors.surface_bright,
-            mat_colors.tertiary,
-            mat_colors.error,
         )
 
-    def update_color_styles(self) -> None:
+    def _on_wallpaper_hashed(
+        self, generation: int, file_key: tuple, future: Future
+    ) -> bool:
         try:
-            with open(COLOR_STYLESHEET, "r") as color_stylesheet:
-                styles = color_stylesheet.read()
-
-            hex_pattern = "#[0-9a-zA-Z]{6,8}"
-            styles = re.sub(
-                rf"--foreground: {hex_pattern}",
-                f"--foreground: {self.colors.foreground}",
-                styles,
-            )
-            styles = re.sub(
-                rf"--foreground-alt: {hex_pattern}",
-                f"--foreground-alt: {self.colors.foreground_alt}",
-                styles,
-            )
-            styles = re.sub(
-                rf"--background: {hex_pattern}",
-                f"--background: {self.colors.background}",
-                styles,
-            )
-            styles = re.sub(
-                rf"--background-alt: {hex_pattern}",
-                f"--background-alt: {self.colors.background_alt}",
-                styles,
-            )
-            styles = re.sub(
-                rf"--background-highlight: {hex_pattern}",
-                f"--background-highlight: {self.colors.background_highlight}",
-                styles,
-            )
-            styles = re.sub(
-                rf"--highlight: {hex_pattern}",
-                f"--highlight: {self.colors.highlight}",
-                styles,
+            content_hash = future.result()
+        except OSError as e:
+            logger.error(f"Could not read wallpaper {file_key[0]}: {e}")
+            return False
+
+        self._content_hashes[file_key] = content_hash
+        if generation == self._theme_generation:
+            self.apply_palette(generation, file_key[0], content_hash)
+
+        return False
+
+    def apply_palette(self, generation: int, path: Path, content_hash: str) -> None:
+        """Applies the cached source color, or extracts it if the image is new."""
+        source_color = self._palette_cache.get(content_hash)
+        if source_color is not None:
+            self.apply_source_color(source_color)
+            return
+
+        launcher = Gio.SubprocessLauncher.new(
+            Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_PIPE
+        )
+        launcher.set_cwd(str(SHELL_DIRECTORY))
+        try:
+            self._extraction = launcher.spawnv(
+                [
+                    sys.executable,
+                    "-m",
+                    "util.theme_worker",
+                    str(path),
+                    str(THEME_IMAGE_SIZE),
+                ]
             )
-            styles = re.sub(
-                rf"--status-fail: {hex_pattern}",
-                f"--status-fail: {self.colors.error}",
-                styles,
+        except GLib.Error as e:
+            logger.error(f"Could not start theme extraction: {e}")
+            return
+
+        self._extraction_cancellable = Gio.Cancellable()
+        self._extraction.communicate_utf8_async(
+            None,
+            self._extraction_cancellable,
+            self._on_theme_extracted,
+            (generation, content_hash),
+        )
+
+    def cancel_extraction(self) -> None:
+        """Stops the extraction for an older request, if one is running."""
+        if self._extraction is None:
+            return
+
+        self._extraction_cancellable.cancel()
+        self._extraction.force_exit()
+        self._extraction = None
+        self._extraction_cancellable = None
+
+    def _on_theme_extracted(
+        self, process: Gio.Subprocess, result: Gio.AsyncResult, request: tuple
+    ) -> None:
+        generation, content_hash = request
+        if process is self._extraction:
+            self._extraction = None
+            self._extraction_cancellable = None
+
+        try:
+            _, stdout, stderr = process.communicate_utf8_finish(result)
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                logger.error(f"Could not create color theme from wallpaper: {e}")
+            return
+
+        if not process.get_successful():
+            logger.error(f"Could not create color theme from wallpaper: {stderr}")
+            return
+
+        source_color = stdout.strip()
+        colors = self.get_source_colors(source_color)
+        if colors is None:
+            return
+
+        # stale results are still worth keeping for later
+        self._palette_cache.put(content_hash, source_color)
+
+        if generation == self._theme_generation:
+            self.apply_colors(colors)
+
+    def apply_source_color(self, source_color: str) -> None:
+        colors = self.get_source_colors(source_color)
+        if colors is not None:
+            self.apply_colors(colors)
+
+    def get_source_colors(self, source_color: str) -> ThemeColors | None:
+        """Colors of the current variant, contrast and mode for a source color."""
+        try:
+            return build_theme_colors(
+                source_color, self.contrast, self.variant, self.dark
             )
+        except ValueError as e:
+            logger.error(f"Could not build color theme from {source_color!r}: {e}")
+            return None
+
+    def apply_colors(self, colors: ThemeColors) -> None:
+        self._colors = colors
+        self.notify("colors")
+        self.update_color_styles()
 
-            with open(COLOR_STYLESHEET, "w") as color_stylesheet:
-                color_stylesheet.write(styles)
+    def update_color_styles(self) -> None:
+        styles = render_color_styles(self.colors)
+        # only the named colors are parsed again, the stylesheets that use
+        # them are restyled by gtk
+        self._color_provider.load_from_data(styles.encode())
 
-        except Exception as e:
-            print(f"Error: Could not update color styles! {e}")
+        tmp_path = THEME_COLORS_PATH + ".tmp"
+        try:
+            with open(tmp_path, "w") as theme_colors:
+                theme_colors.write(styles)
+            os.replace(tmp_path, THEME_COLORS_PATH)
+        except OSError as e:
+            logger.error(f"Could not write theme colors for the runner: {e}")
 
     def hyprpaper_update(self):
         exec_shell_command(f"hyprctl hyprpaper wallpaper , {CURRENT_WALLPAPER_PATH},")
@@ -189,8 +310,44 @@ class ThemeService(Service, Singleton):
             proc.wait_async(None, on_sm_created, None)
 
     def load_wallpapers(self, *args) -> None:
+        """Rescans the wallpaper directory, only differences are emitted."""
         if not WALLPAPERS_DIR.exists() or not WALLPAPERS_DIR.is_dir():
             logger.error("WALLPAPER DIRECTORY DOES NOT EXIST!")
-            return []
+            return
 
-        self.wallpapers = [path for path in WALLPAPERS_DIR.iterdir()]
+        wallpapers = sorted(
+            path for path in WALLPAPERS_DIR.iterdir() if is_wallpaper(path)
+        )
+        if wallpapers == self._wallpapers:
+            return
+
+        removed = set(self._wallpapers).difference(wallpapers)
+        added = set(wallpapers).difference(self._wallpapers)
+
+        self.wallpapers = wallpapers
+        for path in sorted(removed):
+            self.wallpaper_removed(path)
+        for path in sorted(added):
+            self.wallpaper_added(path)
+
+    def _sync_wallpaper(self, path: Path) -> None:
+        """Applies whatever state a file ended up in after a burst of events."""
+        index = bisect.bisect_left(self._wallpapers, path)
+        is_listed = index < len(self._wallpapers) and self._wallpapers[index] == path
+
+        if is_wallpaper(path):
+            if is_listed:
+                self.wallpaper_changed(path)
+            else:
+                self.wallpapers = [
+                    *self._wallpapers[:index],
+                    path,
+                    *self._wallpapers[index:],
+                ]
+                self.wallpaper_added(path)
+        elif is_listed:
+            self.wallpapers = [
+                *self._wallpapers[:index],
+                *self._wallpapers[index + 1 :],
+            ]
+            self.wallpaper_removed(path)
@@ -0,0 +1,106 @@
+import hashlib
+import os
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.client import HTTPException
+from pathlib import Path
+from urllib.request import urlopen
+
+from config.media import (
+    ART_CACHE_DIRECTORY,
+    ART_CACHE_MAX_FILES,
+    ART_FETCH_TIMEOUT,
+    ART_MAX_BYTES,
+)
+from gi.repository import GdkPixbuf, Gio, GLib
+from loguru import logger
+
+from util.disk_cache import PixbufDiskCache
+from util.helpers import get_file_path_from_mpris_url
+from util.singleton import Singleton
+
+ART_LOADER_WORKERS = 2
+
+
+class AlbumArtLoader(Singleton):
+    """
+    Decodes album art from mpris:artUrl off the main thread. Supports file://
+    and data: URIs as well as art served over http(s).
+
+    Art is scaled once and cached on disk as a PNG keyed by a hash of its url
+    and size, so art of tracks played before is a small read. The art of
+    local files is also keyed by their modification time, since players
+    often reuse one file for the art of every track.
+    """
+
+    def __init__(self, cache_directory: str = ART_CACHE_DIRECTORY):
+        self._disk_cache = PixbufDiskCache(cache_directory, ART_CACHE_MAX_FILES)
+        self._executor = ThreadPoolExecutor(
+            max_workers=ART_LOADER_WORKERS, thread_name_prefix="album-art"
+        )
+
+    def load(
+        self,
+        url: str,
+        size: int,
+        on_loaded: Callable[[str, GdkPixbuf.Pixbuf | None], None],
+    ) -> None:
+        """
+        Calls on_loaded on the main thread with the url and the art scaled to
+        fit size, or None if it could not be loaded. Callers should drop
+        results for urls they no longer show.
+        """
+        future = self._executor.submit(self._load, url, size)
+        future.add_done_callback(
+            lambda future: GLib.idle_add(self._dispatch, url, future, on_loaded)
+        )
+
+    def _dispatch(
+        self,
+        url: str,
+        future: Future,
+        on_loaded: Callable[[str, GdkPixbuf.Pixbuf | None], None],
+    ) -> bool:
+        try:
+            pixbuf = future.result()
+        except (OSError, ValueError, HTTPException, GLib.Error) as e:
+            logger.warning(f"Could not load album art from {url[:100]}: {e}")
+            pixbuf = None
+
+        on_loaded(url, pixbuf)
+        return False
+
+    def _load(self, url: str, size: int) -> GdkPixbuf.Pixbuf:
+        cache_key = self.get_cache_key(url, size)
+        pixbuf = self._disk_cache.load(cache_key)
+        if pixbuf is not None:
+            return pixbuf
+
+        stream = Gio.MemoryInputStream.new_from_bytes(GLib.Bytes.new(self._read(url)))
+        pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(
+            stream, size, size, True, None
+        )
+
+        self._disk_cache.store(cache_key, pixbuf)
+        return pixbuf
+
+    def get_cache_key(self, url: str, size: int) -> str:
+        key = f"{size}:{url}"
+        if url.startswith("file://"):
+            stat = os.stat(get_file_path_from_mpris_url(url))
+            key += f":{stat.st_mtime_ns}:{stat.st_size}"
+
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _read(self, url: str) -> bytes:
+        if url.startswith("file://"):
+            return Path(get_file_path_from_mpris_url(url)).read_bytes()
+
+        # urlopen decodes data: URIs as well
+        with urlopen(url, timeout=ART_FETCH_TIMEOUT) as response:
+            data = response.read(ART_MAX_BYTES + 1)
+
+        if len(data) > ART_MAX_BYTES:
+            raise ValueError("album art is too large")
+
+        return data
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+
+import pulsectl
+
+# sources that only mirror a sink's output
+MONITOR_SOURCE_SUFFIX = ".monitor"
+
+
+@dataclass(frozen=True)
+class AudioDevice:
+    index: int
+    name: str
+    description: str
+    volume: float
+    is_muted: bool
+    port: str | None
+
+
+def get_device_identity(device: AudioDevice | None) -> tuple | None:
+    """What a device is shown as, without its volume and mute state."""
+    if device is None:
+        return None
+
+    return (device.name, device.description, device.port)
+
+
+@dataclass(frozen=True)
+class AudioState:
+    """Snapshot of every sink and source, keyed by name."""
+
+    default_sink_name: str | None = None
+    default_source_name: str | None = None
+    sinks: dict[str, AudioDevice] = field(default_factory=dict)
+    sources: dict[str, AudioDevice] = field(default_factory=dict)
+
+    @property
+    def default_sink(self) -> AudioDevice | None:
+        return self.sinks.get(self.default_sink_name)
+
+    @property
+    def default_source(self) -> AudioDevice | None:
+        return self.sources.get(self.default_source_name)
+
+
+def to_audio_device(info) -> AudioDevice:
+    port = info.port_active.description if info.port_active is not None else None
+
+    return AudioDevice(
+        index=info.index,
+        name=info.name,
+        description=info.description,
+        volume=info.volume.value_flat,
+        is_muted=bool(info.mute),
+        port=port,
+    )
+
+
+def read_audio_state(pulse: pulsectl.Pulse) -> AudioState:
+    """Reads every sink and source with three requests."""
+    server_info = pulse.server_info()
+
+    return AudioState(
+        default_sink_name=server_info.default_sink_name,
+        default_source_name=server_info.default_source_name,
+        sinks={sink.name: to_audio_device(sink) for sink in pulse.sink_list()},
+        sources={
+            source.name: to_audio_device(source)
+            for source in pulse.source_list()
+            if not source.name.endswith(MONITOR_SOURCE_SUFFIX)
+        },
+    )
@@ -0,0 +1,72 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from gi.repository import Gio, GLib
+from loguru import logger
+
+# files are usually written in several steps, each sending events
+SETTLE_DELAY_MS = 200
+
+# events that can change whether a file exists or what it holds
+SETTLE_EVENTS = (
+    Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+    Gio.FileMonitorEvent.CREATED,
+    Gio.FileMonitorEvent.DELETED,
+    Gio.FileMonitorEvent.MOVED_IN,
+    Gio.FileMonitorEvent.MOVED_OUT,
+    Gio.FileMonitorEvent.RENAMED,
+)
+
+
+class DirectoryWatcher:
+    """
+    Watches directories and calls on_changed with every path that changed
+    in them, once its events stopped for delay milliseconds. Renames report
+    both the old and the new path. on_changed gets the arguments passed to
+    watch for the directory the path is in, and applies whatever state the
+    path ended up in.
+    """
+
+    def __init__(self, on_changed: Callable[..., None], delay: int = SETTLE_DELAY_MS):
+        self.on_changed = on_changed
+        self.delay = delay
+
+        self._monitors: dict[Path, Gio.FileMonitor] = {}
+        self._pending: dict[Path, int] = {}
+
+    def watch(self, directory: Path, *args) -> None:
+        """Watches a directory, directories that do not exist yet work too."""
+        if directory in self._monitors:
+            return
+
+        try:
+            monitor = Gio.File.new_for_path(str(directory)).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None
+            )
+        except GLib.Error as e:
+            logger.warning(f"Could not watch directory {directory}: {e}")
+            return
+
+        monitor.connect("changed", self.on_directory_changed, args)
+        self._monitors[directory] = monitor
+
+    def on_directory_changed(self, monitor, file, other_file, event, args):
+        if event not in SETTLE_EVENTS:
+            return
+
+        for changed in (file, other_file):
+            if changed is not None and changed.get_path() is not None:
+                self._queue(Path(changed.get_path()), args)
+
+    def _queue(self, path: Path, args: tuple) -> None:
+        source_id = self._pending.pop(path, None)
+        if source_id is not None:
+            GLib.source_remove(source_id)
+
+        self._pending[path] = GLib.timeout_add(self.delay, self._settle, path, args)
+
+    def _settle(self, path: Path, args: tuple) -> bool:
+        self._pending.pop(path, None)
+        self.on_changed(path, *args)
+
+        return False
@@ -0,0 +1,88 @@
+import os
+import threading
+from pathlib import Path
+
+from gi.repository import GdkPixbuf, GLib
+from loguru import logger
+
+# pruning removes files down to this fraction of the limit, so a full cache
+# is not listed again on every store
+PRUNE_TARGET_FRACTION = 0.75
+
+
+class PixbufDiskCache:
+    """
+    Scaled pixbufs stored as PNG files in a directory, named by a key the
+    caller derives from what the image depends on. Loads and stores are safe
+    from worker threads.
+
+    The directory is listed once, on the first store, and the number of
+    files is counted in memory afterwards. Once it passes max_files the
+    files that were written first are removed.
+    """
+
+    def __init__(self, directory: str, max_files: int):
+        self._directory = Path(directory)
+        self._max_files = max_files
+
+        self._lock = threading.Lock()
+        self._file_count: int | None = None
+
+    def get_path(self, key: str) -> Path:
+        return self._directory / f"{key}.png"
+
+    def load(self, key: str) -> GdkPixbuf.Pixbuf | None:
+        try:
+            return GdkPixbuf.Pixbuf.new_from_file(str(self.get_path(key)))
+        except GLib.Error:
+            return None
+
+    def store(self, key: str, pixbuf: GdkPixbuf.Pixbuf) -> None:
+        cache_path = self.get_path(key)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{threading.get_ident()}")
+
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            pixbuf.savev(str(tmp_path), "png", [], [])
+            os.replace(tmp_path, cache_path)
+        except (OSError, GLib.Error) as e:
+            logger.warning(f"Could not write {cache_path}: {e}")
+            return
+
+        with self._lock:
+            if self._file_count is None:
+                self._file_count = len(self._list())
+            else:
+                self._file_count += 1
+
+            if self._file_count > self._max_files:
+                self._prune()
+
+    def _list(self) -> list[Path]:
+        try:
+            return list(self._directory.glob("*.png"))
+        except OSError as e:
+            logger.warning(f"Could not list {self._directory}: {e}")
+            return []
+
+    def _prune(self) -> None:
+        """Removes the files that were written first."""
+        paths = []
+        for path in self._list():
+            try:
+                paths.append((path.stat().st_mtime, path))
+            except OSError:
+                # removed since it was listed
+                continue
+
+        paths.sort()
+        keep = int(self._max_files * PRUNE_TARGET_FRACTION)
+        removed = 0
+        for _, path in paths[: max(0, len(paths) - keep)]:
+            try:
+                path.unlink(missing_ok=True)
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Could not prune {path}: {e}")
+
+        self._file_count = len(paths) - removed
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+
+import pynvml
+from config.sys_info import GPU_DEVICE_INDEX
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class GPUSample:
+    utilization: float  # percent
+    memory_used: int  # bytes
+    memory_total: int  # bytes
+    temperature: int  # celsius
+
+    @property
+    def memory_usage(self) -> float:
+        if self.memory_total == 0:
+            return 0.0
+        return 100.0 * self.memory_used / self.memory_total
+
+
+EMPTY_GPU_SAMPLE = GPUSample(0.0, 0, 0, 0)
+
+
+class NVMLBackend:
+    """
+    Reads a device through raw NVML calls. The device handle is looked up
+    once, so a sample is three small C calls instead of a full device query.
+    """
+
+    def __init__(self, device_index: int = GPU_DEVICE_INDEX):
+        pynvml.nvmlInit()
+        self._handle = pynvml.nvmlDeviceGetHandleByIndex(device_index)
+
+    def sample(self) -> GPUSample:
+        try:
+            utilization = pynvml.nvmlDeviceGetUtilizationRates(self._handle)
+            memory = pynvml.nvmlDeviceGetMemoryInfo(self._handle)
+            temperature = pynvml.nvmlDeviceGetTemperature(
+                self._handle, pynvml.NVML_TEMPERATURE_GPU
+            )
+        except pynvml.NVMLError as e:
+            logger.warning(f"Could not sample GPU. {e}")
+            return EMPTY_GPU_SAMPLE
+
+        return GPUSample(float(utilization.gpu), memory.used, memory.total, temperature)
+
+    def shutdown(self) -> None:
+        pynvml.nvmlShutdown()
+
+
+class NullGPUBackend:
+    """Used when there is no NVIDIA device, every sample is empty."""
+
+    def sample(self) -> GPUSample:
+        return EMPTY_GPU_SAMPLE
+
+    def shutdown(self) -> None:
+        pass
+
+
+def get_gpu_backend() -> NVMLBackend | NullGPUBackend:
+    try:
+        return NVMLBackend()
+    except pynvml.NVMLError as e:
+        logger.info(f"No NVIDIA device available, GPU usage is disabled. {e}")
+        return NullGPUBackend()
@@ -1,4 +1,4 @@
-from gi.repository import Gtk, GdkPixbuf
+from gi.repository import GdkPixbuf
 import os
 import platform
 import locale
@@ -7,6 +7,7 @@ from pathlib import Path
 from loguru import logger
 
 from config.storage import STORAGE_DIRECTORY
+from util.icon_cache import IconPixbufCache
 
 
 def get_file_path_from_mpris_url(mpris_url: str) -> str:
@@ -27,22 +28,15 @@ def get_pixbuff(
 
 
 def get_app_icon_pixbuf(
-    name: str, width: int, height: int, preserve_aspect_ratio: bool = True
+    name: str,
+    width: int,
+    height: int,
+    preserve_aspect_ratio: bool = True,
+    scale: int = 1,
 ) -> GdkPixbuf.Pixbuf | None:
-    icon_theme = Gtk.IconTheme.get_default()
-    icon_info = icon_theme.lookup_icon(name, width, 0)  # No Flags
-    if icon_info is not None:
-        icon_path = icon_info.get_filename()
-        try:
-            icon_pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                icon_path, width, height, preserve_aspect_ratio
-            )
-            return icon_pixbuf
-        except Exception as e:
-            logger.error(f"{e}")
-            return None
-
-    return None
+    return IconPixbufCache.get_instance().get(
+        name, width, height, preserve_aspect_ratio, scale
+    )
 
 
 def get_user_login_name():
@@ -0,0 +1,113 @@
+import os
+from collections import OrderedDict
+
+from gi.repository import GdkPixbuf, GLib, Gtk
+from loguru import logger
+
+from util.singleton import Singleton
+
+ICON_CACHE_CAPACITY = 256
+
+
+def load_pixbuf(
+    path: str, width: int, height: int, preserve_aspect_ratio: bool = True
+) -> GdkPixbuf.Pixbuf | None:
+    """Decodes an image file, safe to call from worker threads."""
+    try:
+        return GdkPixbuf.Pixbuf.new_from_file_at_scale(
+            path, width, height, preserve_aspect_ratio
+        )
+    except GLib.Error as e:
+        logger.error(f"{e}")
+        return None
+
+
+class IconPixbufCache(Singleton):
+    """
+    Bounded LRU cache of decoded themed icons keyed by
+    (icon name, width, height, scale, aspect ratio, icon theme). Failed lookups are cached
+    as well so icons that do not exist do not hit the icon theme every time.
+    The cache is cleared whenever the icon theme changes.
+
+    Shared by the shell and the runner, each process holds its own instance.
+    """
+
+    def __init__(self, capacity: int = ICON_CACHE_CAPACITY):
+        self._capacity = capacity
+        self._pixbufs: OrderedDict[tuple, GdkPixbuf.Pixbuf | None] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self._icon_theme = Gtk.IconTheme.get_default()
+        self._icon_theme.connect("changed", self.invalidate)
+
+    def get(
+        self,
+        name: str,
+        width: int,
+        height: int,
+        preserve_aspect_ratio: bool = True,
+        scale: int = 1,
+    ) -> GdkPixbuf.Pixbuf | None:
+        key = self.make_key(name, width, height, scale, preserve_aspect_ratio)
+        found, pixbuf = self.get_cached(key)
+        if found:
+            return pixbuf
+
+        icon_path = self.lookup_path(name, width, scale)
+        if icon_path is not None:
+            pixbuf = load_pixbuf(
+                icon_path, width * scale, height * scale, preserve_aspect_ratio
+            )
+
+        self.put(key, pixbuf)
+        return pixbuf
+
+    def make_key(
+        self,
+        name: str,
+        width: int,
+        height: int,
+        scale: int = 1,
+        preserve_aspect_ratio: bool = True,
+    ) -> tuple:
+        theme_name = Gtk.Settings.get_default().get_property("gtk-icon-theme-name")
+        return (name, width, height, scale, preserve_aspect_ratio, theme_name)
+
+    def get_cached(self, key: tuple) -> tuple[bool, GdkPixbuf.Pixbuf | None]:
+        """Returns whether the key is cached and the cached pixbuf."""
+        if key not in self._pixbufs:
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        self._pixbufs.move_to_end(key)
+        return True, self._pixbufs[key]
+
+    def put(self, key: tuple, pixbuf: GdkPixbuf.Pixbuf | None) -> None:
+        self._pixbufs[key] = pixbuf
+        self._pixbufs.move_to_end(key)
+
+        if len(self._pixbufs) > self._capacity:
+            self._pixbufs.popitem(last=False)
+
+    def lookup_path(self, name: str, size: int, scale: int = 1) -> str | None:
+        """
+        Resolves an icon name to a file. The icon theme is not thread safe,
+        only call this on the main thread.
+        """
+        if os.path.isabs(name):
+            return name if os.path.isfile(name) else None
+
+        icon_info = self._icon_theme.lookup_icon_for_scale(name, size, scale, 0)
+        if icon_info is not None:
+            return icon_info.get_filename()
+
+        return None
+
+    def invalidate(self, *args) -> None:
+        logger.debug(
+            f"Clearing icon cache of {len(self._pixbufs)} icons "
+            + f"({self.hits} hits, {self.misses} misses)"
+        )
+        self._pixbufs.clear()
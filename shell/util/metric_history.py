@@ -0,0 +1,60 @@
+from array import array
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class MetricStats:
+    minimum: float
+    average: float
+    maximum: float
+
+
+class MetricHistory:
+    """
+    Fixed size ring buffer of timestamped samples. Samples live in two
+    preallocated arrays instead of Python objects, so memory stays the same
+    however long the shell runs and the oldest samples are overwritten.
+    """
+
+    def __init__(self, capacity: int):
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("f", bytes(4 * capacity))
+        self._capacity = capacity
+        # index the next sample is written to
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, time: float, value: float) -> None:
+        self._times[self._head] = time
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+
+    def _window_indexes(self, seconds: float, now: float):
+        """Indexes of the samples within the window, newest first."""
+        start = now - seconds
+        for offset in range(1, self._size + 1):
+            index = (self._head - offset) % self._capacity
+            if self._times[index] < start:
+                return
+            yield index
+
+    def samples(self, seconds: float, now: float) -> tuple[list[float], list[float]]:
+        """Times and values of the samples within the window, oldest first."""
+        indexes = list(self._window_indexes(seconds, now))
+        indexes.reverse()
+
+        return (
+            [self._times[index] for index in indexes],
+            [self._values[index] for index in indexes],
+        )
+
+    def stats(self, seconds: float, now: float) -> MetricStats | None:
+        values = [self._values[index] for index in self._window_indexes(seconds, now)]
+        if len(values) == 0:
+            return None
+
+        return MetricStats(min(values), sum(values) / len(values), max(values))
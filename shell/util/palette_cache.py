@@ -0,0 +1,69 @@
+import json
+import os
+from pathlib import Path
+
+from config.theme import PALETTE_CACHE_MAX_IMAGES, PALETTE_CACHE_PATH
+from loguru import logger
+
+
+class PaletteCache:
+    """
+    Source colors of wallpaper themes, persisted as JSON and keyed by the
+    hash of the image content. Every variant, contrast and the dark and
+    light colors are derived from the source color, so an image is only
+    quantized once and going back to a wallpaper never quantizes it again.
+
+    Images that were used least recently are dropped past
+    PALETTE_CACHE_MAX_IMAGES.
+    """
+
+    def __init__(self, path: str = PALETTE_CACHE_PATH):
+        self._path = Path(path)
+        # content hash -> hex source color
+        self._source_colors: dict[str, str] = {}
+
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            source_colors = json.loads(self._path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read palette cache, starting empty. {e}")
+            return
+
+        # caches of older versions held whole schemes, those are extracted again
+        if isinstance(source_colors, dict):
+            self._source_colors = {
+                content_hash: color
+                for content_hash, color in source_colors.items()
+                if isinstance(color, str)
+            }
+
+    def get(self, content_hash: str) -> str | None:
+        source_color = self._source_colors.pop(content_hash, None)
+        if source_color is not None:
+            # keep recently used images at the end
+            self._source_colors[content_hash] = source_color
+
+        return source_color
+
+    def put(self, content_hash: str, source_color: str) -> None:
+        self._source_colors.pop(content_hash, None)
+        self._source_colors[content_hash] = source_color
+
+        while len(self._source_colors) > PALETTE_CACHE_MAX_IMAGES:
+            self._source_colors.pop(next(iter(self._source_colors)))
+
+        self._save()
+
+    def _save(self) -> None:
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(self._source_colors))
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.error(f"Could not write palette cache. {e}")
@@ -0,0 +1,50 @@
+from gi.repository import GLib
+
+
+class PlaybackClock:
+    """
+    Position of the playing track, interpolated from the monotonic clock.
+
+    The clock is anchored to a position read from the player whenever
+    something moves it, like a seek, a status change or a new track, so
+    reading it never needs a D-Bus call. Positions are in microseconds,
+    like MPRIS.
+    """
+
+    def __init__(self):
+        self.length = 0
+        self.is_playing = False
+        self.rate = 1.0
+
+        self._anchor_position = 0
+        self._anchor_time = GLib.get_monotonic_time()
+
+    def sync(
+        self, position: int, is_playing: bool, length: int, rate: float = 1.0
+    ) -> None:
+        self._anchor_position = position
+        self._anchor_time = GLib.get_monotonic_time()
+        self.is_playing = is_playing
+        self.length = length
+        self.rate = rate
+
+    def reset(self) -> None:
+        self.sync(0, False, 0)
+
+    def get_position(self, now: int | None = None) -> int:
+        position = self._anchor_position
+        if self.is_playing:
+            now = GLib.get_monotonic_time() if now is None else now
+            position += int((now - self._anchor_time) * self.rate)
+
+        if self.length > 0:
+            position = min(position, self.length)
+
+        return max(0, position)
+
+    def get_fraction(self, now: int | None = None) -> float:
+        """Played part of the track between 0 and 1, 0 if its length is unknown."""
+        if self.length <= 0:
+            return 0.0
+
+        return self.get_position(now) / self.length
@@ -0,0 +1,104 @@
+import re
+import time
+from pathlib import Path
+
+from gi.repository import Gdk, GLib, Gtk
+from loguru import logger
+
+from util.directory_watcher import DirectoryWatcher
+
+IMPORT_PATTERN = re.compile(r"""@import\s+url\(\s*["']?([^"')]+?)["']?\s*\)\s*;""")
+
+# a save usually sends several events, they are applied once things settle
+RELOAD_DELAY_MS = 100
+
+# rules of the main stylesheet itself, like the global reset, sit below the
+# imported stylesheets since gtk picks providers before selectors
+GLOBAL_PRIORITY = Gtk.STYLE_PROVIDER_PRIORITY_USER - 1
+STYLESHEET_PRIORITY = Gtk.STYLE_PROVIDER_PRIORITY_USER
+
+
+class StyleManager:
+    """
+    Loads a main stylesheet and every stylesheet it imports into a provider
+    of their own, so a changed file only reparses that file. Imported
+    stylesheets override each other in import order.
+
+    The directories of all stylesheets are watched and reloads are debounced
+    per file. Changing the imports of the main stylesheet rebuilds every
+    provider.
+    """
+
+    def __init__(self, main_stylesheet: str):
+        self.main_stylesheet = Path(main_stylesheet).resolve()
+
+        self._screen = Gdk.Screen.get_default()
+        self._global_provider = Gtk.CssProvider()
+        # imported stylesheets in import order
+        self._providers: dict[Path, Gtk.CssProvider] = {}
+
+        self._watcher = DirectoryWatcher(self._reload, RELOAD_DELAY_MS)
+
+    def load(self) -> None:
+        Gtk.StyleContext.add_provider_for_screen(
+            self._screen, self._global_provider, GLOBAL_PRIORITY
+        )
+        self._load_main_stylesheet()
+
+    def _load_main_stylesheet(self) -> None:
+        try:
+            styles = self.main_stylesheet.read_text()
+        except OSError as e:
+            logger.error(f"Could not read stylesheet {self.main_stylesheet}: {e}")
+            return
+
+        paths = [
+            (self.main_stylesheet.parent / url).resolve()
+            for url in IMPORT_PATTERN.findall(styles)
+        ]
+        if paths != list(self._providers):
+            self._set_stylesheets(paths)
+
+        global_styles = IMPORT_PATTERN.sub("", styles)
+        self._timed_load(
+            self.main_stylesheet,
+            lambda: self._global_provider.load_from_data(global_styles.encode()),
+        )
+        self._watcher.watch(self.main_stylesheet.parent)
+
+    def _set_stylesheets(self, paths: list[Path]) -> None:
+        for provider in self._providers.values():
+            Gtk.StyleContext.remove_provider_for_screen(self._screen, provider)
+
+        self._providers = {}
+        for path in paths:
+            provider = Gtk.CssProvider()
+            # providers of the same priority override the ones added before
+            Gtk.StyleContext.add_provider_for_screen(
+                self._screen, provider, STYLESHEET_PRIORITY
+            )
+            self._providers[path] = provider
+
+            self._load_stylesheet(path)
+            self._watcher.watch(path.parent)
+
+    def _load_stylesheet(self, path: Path) -> None:
+        provider = self._providers[path]
+        self._timed_load(path, lambda: provider.load_from_path(str(path)))
+
+    def _timed_load(self, path: Path, load) -> None:
+        start = time.perf_counter()
+        try:
+            load()
+        except GLib.Error as e:
+            logger.error(f"Could not load stylesheet {path.name}: {e}")
+            return
+
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f"Loaded stylesheet {path.name} in {elapsed:.1f} ms")
+
+    def _reload(self, path: Path) -> None:
+        if path == self.main_stylesheet:
+            self._load_main_stylesheet()
+        elif path in self._providers:
+            self._load_stylesheet(path)
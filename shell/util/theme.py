@@ -1,4 +1,9 @@
-from dataclasses import dataclass
+import hashlib
+from dataclasses import asdict, dataclass
+from string import Template
+
+from material_color_utilities import Variant, theme_from_color, theme_from_image
+from PIL import Image
 
 
 @dataclass
@@ -10,3 +15,72 @@ class ThemeColors:
     background_highlight: str
     highlight: str
     error: str
+
+
+# css color name -> ThemeColors field, names match colors.css
+THEME_COLOR_NAMES = {
+    "foreground": "foreground",
+    "foreground_alt": "foreground_alt",
+    "background": "background",
+    "background_alt": "background_alt",
+    "background_highlight": "background_highlight",
+    "highlight": "highlight",
+    "status_fail": "error",
+}
+
+# compiled once, a theme change only substitutes its colors
+COLOR_STYLES_TEMPLATE = Template(
+    "".join(
+        f"@define-color {name} ${field};\n" for name, field in THEME_COLOR_NAMES.items()
+    )
+)
+
+
+def render_color_styles(colors: ThemeColors) -> str:
+    """Named colors that override the defaults of colors.css."""
+    return COLOR_STYLES_TEMPLATE.substitute(asdict(colors))
+
+
+def hash_file(path: str) -> str:
+    """sha256 of a file's content, so a wallpaper is recognized under any name."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(1024 * 1024):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def to_theme_colors(scheme) -> ThemeColors:
+    return ThemeColors(
+        scheme.primary,
+        scheme.on_surface,
+        scheme.background,
+        scheme.surface_container,
+        scheme.surface_bright,
+        scheme.tertiary,
+        scheme.error,
+    )
+
+
+def extract_source_color(image_path: str, size: int) -> str:
+    """
+    Quantizes an image scaled down to fit size and returns the hex color a
+    material theme of it is built from. Runs in the theme worker process.
+    """
+    with Image.open(image_path) as image:
+        # lets jpeg decode at a fraction of its resolution
+        image.draft("RGB", (size, size))
+        image = image.convert("RGB")
+        image.thumbnail((size, size))
+
+    return theme_from_image(image).source
+
+
+def build_theme_colors(
+    source_color: str, contrast: float, variant: Variant, dark: bool
+) -> ThemeColors:
+    """Colors of the material theme of a source color, cheap enough to run often."""
+    theme = theme_from_color(source_color, contrast, variant)
+
+    return to_theme_colors(theme.schemes.dark if dark else theme.schemes.light)
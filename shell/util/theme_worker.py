@@ -0,0 +1,19 @@
+"""
+Extracts the source color of a wallpaper's theme in a process of its own. The
+ThemeService runs it with python -m from the shell directory, so it only
+imports what extraction needs and never gtk or the shell's entry point.
+
+Usage: python -m util.theme_worker IMAGE SIZE
+"""
+import sys
+
+from util.theme import extract_source_color
+
+
+def main() -> None:
+    image_path, size = sys.argv[1:]
+    print(extract_source_color(image_path, int(size)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import hashlib
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from config.theme import THUMBNAIL_CACHE_MAX_FILES, THUMBNAIL_DIRECTORY
+from gi.repository import GdkPixbuf, GLib
+from loguru import logger
+
+from util.disk_cache import PixbufDiskCache
+from util.singleton import Singleton
+
+THUMBNAIL_WORKERS = 4
+# decoded thumbnails kept around, so scrolling back does not read them again
+THUMBNAIL_MEMORY_CAPACITY = 64
+
+
+class ThumbnailCache(Singleton):
+    """
+    Thumbnails of images, scaled in a pool of worker threads and cached on
+    disk as PNG. Thumbnails are keyed by the image's path, modification time
+    and size, so an edited image gets a new one.
+
+    Requests for a thumbnail that is already being made share its result.
+    Only use it from the main thread, results are delivered there as well.
+    """
+
+    def __init__(self, directory: str = THUMBNAIL_DIRECTORY):
+        self._disk_cache = PixbufDiskCache(directory, THUMBNAIL_CACHE_MAX_FILES)
+        self._executor = ThreadPoolExecutor(
+            max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnails"
+        )
+
+        self._pixbufs: OrderedDict[str, GdkPixbuf.Pixbuf] = OrderedDict()
+        self._pending: dict[str, list[Callable]] = {}
+
+    def load(
+        self,
+        path: Path,
+        width: int,
+        height: int,
+        on_loaded: Callable[[Path, GdkPixbuf.Pixbuf | None], None],
+    ) -> None:
+        """Calls on_loaded with the thumbnail, or None if it could not be made."""
+        try:
+            stat = path.stat()
+        except OSError as e:
+            logger.warning(f"Could not read {path}: {e}")
+            on_loaded(path, None)
+            return
+
+        key = hashlib.sha256(
+            f"{path}:{stat.st_mtime_ns}:{stat.st_size}:{width}x{height}".encode()
+        ).hexdigest()
+
+        pixbuf = self._pixbufs.get(key)
+        if pixbuf is not None:
+            self._pixbufs.move_to_end(key)
+            on_loaded(path, pixbuf)
+            return
+
+        callbacks = self._pending.get(key)
+        if callbacks is not None:
+            callbacks.append(on_loaded)
+            return
+
+        self._pending[key] = [on_loaded]
+        future = self._executor.submit(self._load, key, path, width, height)
+        future.add_done_callback(
+            lambda future: GLib.idle_add(self._dispatch, key, path, future)
+        )
+
+    def _dispatch(self, key: str, path: Path, future: Future) -> bool:
+        try:
+            pixbuf = future.result()
+        except (OSError, GLib.Error) as e:
+            logger.warning(f"Could not create thumbnail of {path}: {e}")
+            pixbuf = None
+
+        if pixbuf is not None:
+            self._pixbufs[key] = pixbuf
+            if len(self._pixbufs) > THUMBNAIL_MEMORY_CAPACITY:
+                self._pixbufs.popitem(last=False)
+
+        for on_loaded in self._pending.pop(key, []):
+            on_loaded(path, pixbuf)
+
+        return False
+
+    def _load(self, key: str, path: Path, width: int, height: int) -> GdkPixbuf.Pixbuf:
+        pixbuf = self._disk_cache.load(key)
+        if pixbuf is not None:
+            return pixbuf
+
+        # decoders like jpeg scale while decoding, full images are never held
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(str(path), width, height, True)
+        self._disk_cache.store(key, pixbuf)
+
+        return pixbuf
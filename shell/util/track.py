@@ -0,0 +1,43 @@
+from dataclasses import dataclass, fields
+
+from gi.repository import GLib
+
+
+@dataclass(frozen=True)
+class TrackMetadata:
+    """The parts of MPRIS metadata the shell shows, normalized to plain values."""
+
+    track_id: str = ""
+    title: str = ""
+    artists: tuple[str, ...] = ()
+    album: str = ""
+    art_url: str = ""
+    length: int = 0  # microseconds
+
+    @classmethod
+    def from_variant(cls, metadata: GLib.Variant | None) -> "TrackMetadata":
+        values = metadata.unpack() if metadata is not None else {}
+
+        return cls(
+            track_id=str(values.get("mpris:trackid", "")),
+            title=values.get("xesam:title", ""),
+            # players send [""] when a track has no artist
+            artists=tuple(
+                artist for artist in values.get("xesam:artist", []) if artist != ""
+            ),
+            album=values.get("xesam:album", ""),
+            art_url=values.get("mpris:artUrl", ""),
+            length=int(values.get("mpris:length", 0)),
+        )
+
+    def changed_fields(self, other: "TrackMetadata") -> frozenset[str]:
+        """Names of the fields that differ from another track."""
+        return frozenset(
+            field.name
+            for field in fields(self)
+            if getattr(self, field.name) != getattr(other, field.name)
+        )
+
+
+EMPTY_TRACK = TrackMetadata()
+TRACK_FIELDS = frozenset(field.name for field in fields(TrackMetadata))
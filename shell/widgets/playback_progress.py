@@ -0,0 +1,61 @@
+import cairo
+from gi.repository import Gtk
+from util.playback_clock import PlaybackClock
+
+
+class PlaybackProgress(Gtk.DrawingArea):
+    """
+    Thin bar showing how much of the track has played. While the clock is
+    playing it redraws from a frame clock tick callback, but only when the
+    filled width moves by a pixel.
+    """
+
+    def __init__(self, clock: PlaybackClock, height: int = 3, **kwargs):
+        super().__init__(**kwargs)
+        self.set_size_request(-1, height)
+
+        self.clock = clock
+
+        self._tick_id = None
+        self._drawn_width = -1
+
+        self.connect("draw", self.on_draw)
+        self.connect("map", lambda *_: self.update())
+        self.connect("unmap", lambda *_: self._stop_ticking())
+
+    def update(self) -> None:
+        """Call after the clock was synced."""
+        self.queue_draw()
+
+        if self.clock.is_playing and self.get_mapped():
+            if self._tick_id is None:
+                self._tick_id = self.add_tick_callback(self.on_tick)
+        else:
+            self._stop_ticking()
+
+    def _stop_ticking(self) -> None:
+        if self._tick_id is not None:
+            self.remove_tick_callback(self._tick_id)
+            self._tick_id = None
+
+    def get_filled_width(self, frame_time: int | None = None) -> int:
+        return round(self.get_allocated_width() * self.clock.get_fraction(frame_time))
+
+    def on_tick(self, widget, frame_clock) -> bool:
+        if self.get_filled_width(frame_clock.get_frame_time()) != self._drawn_width:
+            self.queue_draw()
+
+        return True
+
+    def on_draw(self, widget, cr: cairo.Context):
+        self._drawn_width = self.get_filled_width()
+        height = self.get_allocated_height()
+
+        color = self.get_style_context().get_color(Gtk.StateFlags.NORMAL)
+        cr.set_source_rgba(color.red, color.green, color.blue, color.alpha * 0.25)
+        cr.rectangle(0, 0, self.get_allocated_width(), height)
+        cr.fill()
+
+        cr.set_source_rgba(color.red, color.green, color.blue, color.alpha)
+        cr.rectangle(0, 0, self._drawn_width, height)
+        cr.fill()
@@ -0,0 +1,71 @@
+from collections.abc import Iterable
+
+import cairo
+from gi.repository import Gtk
+
+
+class Sparkline(Gtk.DrawingArea):
+    """
+    Line graph of timestamped values between 0 and max_value over a time
+    window ending now, drawn in the widget's CSS color.
+    """
+
+    def __init__(
+        self,
+        width: int = 240,
+        height: int = 60,
+        max_value: float = 100.0,
+        line_width: float = 2.0,
+        style_classes: Iterable[str] | str | None = None,
+        **kwargs,
+    ):
+        # a plain DrawingArea does not take fabric's style_classes
+        super().__init__(**kwargs)
+        self.set_size_request(width, height)
+
+        if isinstance(style_classes, str):
+            style_classes = [style_classes]
+        style_context = self.get_style_context()
+        for style_class in style_classes or []:
+            style_context.add_class(style_class)
+
+        self.max_value = max_value
+        self.line_width = line_width
+
+        self._times = []
+        self._values = []
+        self._start = 0.0
+        self._end = 1.0
+
+        self.connect("draw", self.on_draw)
+
+    def set_samples(
+        self, times: list[float], values: list[float], start: float, end: float
+    ) -> None:
+        self._times = times
+        self._values = values
+        self._start = start
+        self._end = end
+        self.queue_draw()
+
+    def on_draw(self, widget, cr: cairo.Context):
+        if len(self._values) < 2 or self._end <= self._start:
+            return
+
+        width = self.get_allocated_width()
+        height = self.get_allocated_height() - self.line_width
+        duration = self._end - self._start
+
+        color = self.get_style_context().get_color(Gtk.StateFlags.NORMAL)
+        cr.set_source_rgba(color.red, color.green, color.blue, color.alpha)
+        cr.set_line_width(self.line_width)
+        cr.set_line_join(cairo.LINE_JOIN_ROUND)
+
+        for time, value in zip(self._times, self._values):
+            x = width * (time - self._start) / duration
+            y = self.line_width / 2 + height * (
+                1 - min(max(value, 0.0), self.max_value) / self.max_value
+            )
+            cr.line_to(x, y)
+
+        cr.stroke()
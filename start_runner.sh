@@ -1,3 +1,4 @@
 cd /home/cody/Fabric
 source .venv/bin/activate
-python runner/main.py
+# show the resident runner if there is one, otherwise start it
+python runner/ipc.py show || python runner/main.py